@@ -0,0 +1,128 @@
+#! /usr/bin/env python
+
+"""Measure the memory used by each command instance.
+
+The current (slotted) command classes are compared with the dictionary-based implementation that preceded them, which
+is reproduced below as the baseline.
+
+Usage: python command_memory.py [count]
+
+"""
+
+# Imports
+
+import sys
+import tracemalloc
+
+# Set path before importing the package.
+sys.path.insert(0, "../")
+
+from scripttease.library.commands.base import Command, ItemizedCommand
+from scripttease.library.overlays.posix import mkdir
+
+# Baseline
+
+
+class LegacySudo(object):
+
+    def __init__(self, enabled=False, user="root"):
+        self.enabled = enabled
+        self.user = user
+
+
+class LegacyCommand(object):
+
+    def __init__(self, statement, comment=None, condition=None, cd=None, environments=None, function=None, name=None,
+                 prefix=None, register=None, shell=None, stop=False, sudo=None, tags=None, **kwargs):
+        self.comment = comment
+        self.condition = condition
+        self.cd = cd
+        self.environments = environments or list()
+        self.function = function
+        self.name = name
+        self.prefix = prefix
+        self.register = register
+        self.shell = shell
+        self.statement = statement
+        self.stop = stop
+        self.tags = tags or list()
+
+        if type(sudo) is str:
+            self.sudo = LegacySudo(enabled=True, user=sudo)
+        elif sudo is True:
+            self.sudo = LegacySudo(enabled=True)
+        else:
+            self.sudo = LegacySudo()
+
+        self._attributes = kwargs
+
+    def __getattr__(self, item):
+        return self._attributes.get(item)
+
+
+class LegacyItemizedCommand(object):
+
+    def __init__(self, callback, items, *args, name=None, **kwargs):
+        self.args = args
+        self.callback = callback
+        self.items = items
+        self.kwargs = kwargs
+        self.name = name
+
+        self.kwargs.setdefault("environments", list())
+        self.kwargs.setdefault("tags", list())
+
+# Functions
+
+
+def measure(callback, count):
+    """Get the number of bytes allocated per instance created by the callback."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    instances = [callback(i) for i in range(count)]
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The list that holds the instances is not counted.
+    return (after - before - sys.getsizeof(instances)) / count
+
+
+def main(count=10000):
+    print("Bytes per command (%s instances)" % count)
+    print("")
+
+    rows = [
+        (
+            "command",
+            lambda i: LegacyCommand("touch /tmp/%s" % i, comment="touch %s" % i),
+            lambda i: Command("touch /tmp/%s" % i, comment="touch %s" % i),
+        ),
+        (
+            "command with sudo",
+            lambda i: LegacyCommand("touch /tmp/%s" % i, comment="touch %s" % i, sudo="deploy"),
+            lambda i: Command("touch /tmp/%s" % i, comment="touch %s" % i, sudo="deploy"),
+        ),
+        (
+            "command with tags",
+            lambda i: LegacyCommand("touch /tmp/%s" % i, comment="touch %s" % i, tags=["web"]),
+            lambda i: Command("touch /tmp/%s" % i, comment="touch %s" % i, tags=["web"]),
+        ),
+        (
+            "itemized command",
+            lambda i: LegacyItemizedCommand(mkdir, ["one", "two"], "/tmp/%s/$item" % i, comment="create directories"),
+            lambda i: ItemizedCommand(mkdir, ["one", "two"], "/tmp/%s/$item" % i, comment="create directories"),
+        ),
+    ]
+
+    print("%-20s %10s %10s" % ("", "before", "after"))
+    for label, before, after in rows:
+        print("%-20s %10.1f %10.1f" % (label, measure(before, count), measure(after, count)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+
+"""Measure the peak memory used to read the sections of a large configuration file.
+
+Reading the whole file with ConfigParser is compared with reading it a group of sections at a time. Only the sections
+are read; commands are not created.
+
+Usage: python ini_memory.py [count]
+
+"""
+
+# Imports
+
+from configparser import ConfigParser
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Set path before importing the package.
+sys.path.insert(0, "../")
+
+from scripttease.parsers.ini import Config
+
+# Functions
+
+
+def measure(callback):
+    """Get the peak number of bytes allocated and the seconds elapsed while the callback is consumed."""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    count = 0
+    for section in callback():
+        count += 1
+
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return count, peak, elapsed
+
+
+def read_all(path):
+    """Read the file all at once, as was done before sections were streamed."""
+    def _read():
+        ini = ConfigParser()
+        with open(path, "r") as f:
+            ini.read_string(f.read())
+
+        for section in ini.sections():
+            yield section, ini.items(section)
+
+    return _read
+
+
+def main(count=20000):
+    handle, path = tempfile.mkstemp(suffix=".ini")
+    with os.fdopen(handle, "w") as f:
+        for i in range(count):
+            f.write("[create directory %s]\nmkdir: /var/www/%s\nmode: 755\ntags: web, setup\n\n" % (i, i))
+
+    print("Reading %s sections (%0.1f MB)" % (count, os.path.getsize(path) / 1024 / 1024))
+    print("")
+
+    config = Config(path)
+
+    print("%-20s %12s %10s" % ("", "peak (KB)", "seconds"))
+    for label, callback in (("all at once", read_all(path)), ("group at a time", config._iter_sections)):
+        total, peak, elapsed = measure(callback)
+        print("%-20s %12.1f %10.3f" % (label, peak / 1024, elapsed))
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+
+"""Compare the parse throughput of the INI and YAML configuration formats.
+
+The same set of commands is written in both formats. Each file is then read (sections only) and loaded (commands are
+created) several times, and the best time of each is reported.
+
+Usage: python parse_throughput.py [count]
+
+"""
+
+# Imports
+
+import os
+import sys
+import tempfile
+import time
+
+# Set path before importing the package.
+sys.path.insert(0, "../")
+
+from scripttease.parsers.ini import Config
+from scripttease.parsers.yaml import YAML
+
+# Constants
+
+REPEAT = 3
+
+# Functions
+
+
+def measure(callback):
+    """Get the best number of seconds taken by the callback."""
+    best = None
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        callback()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def write_ini(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write("[create directory %s]\n" % i)
+            f.write("mkdir: /var/www/%s\n" % i)
+            f.write("mode: 755\n")
+            f.write("tags: web, setup\n\n")
+
+
+def write_yaml(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write("create directory %s:\n" % i)
+            f.write("  mkdir: /var/www/%s\n" % i)
+            f.write("  mode: 755\n")
+            f.write("  tags: [web, setup]\n\n")
+
+
+def main(count=10000):
+    directory = tempfile.mkdtemp()
+
+    ini_path = os.path.join(directory, "commands.ini")
+    write_ini(ini_path, count)
+
+    yaml_path = os.path.join(directory, "commands.yml")
+    write_yaml(yaml_path, count)
+
+    print("Sections parsed per second for %s commands (best of %s)" % (count, REPEAT))
+    print("")
+    print("%-10s %14s %14s" % ("", "read", "load"))
+    for label, parser_class, path in (("ini", Config, ini_path), ("yaml", YAML, yaml_path)):
+        read = measure(lambda: list(parser_class(path)._iter_sections()))
+        load = measure(lambda: parser_class(path).load())
+        print("%-10s %14.0f %14.0f" % (label, count / read, count / load))
+
+    os.remove(ini_path)
+    os.remove(yaml_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
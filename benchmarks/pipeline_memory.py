@@ -0,0 +1,111 @@
+#! /usr/bin/env python
+
+"""Measure the peak memory used to turn a large configuration file into statements.
+
+The staged approach (loading every command, filtering the list, and joining the output) is compared with
+``iter_statements()``, where each section is read, filtered, rendered and written before the next is read. Each is
+measured for an increasing number of sections. When duplicate sections are not checked (``strict=False``), the peak of
+the pipeline does not grow with the size of the file. Times include the overhead of tracing memory allocations.
+
+Usage: python pipeline_memory.py [count]
+
+"""
+
+# Imports
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Set path before importing the package.
+sys.path.insert(0, "../")
+
+from scripttease.parsers.utils import filter_commands, iter_statements, load_commands
+
+# Constants
+
+FILTERS = {
+    'environments': ["live"],
+}
+
+# Functions
+
+
+def measure(callback, path):
+    """Get the peak number of bytes allocated and the seconds elapsed while the callback writes the output."""
+    with open(os.devnull, "w") as f:
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        callback(path, f)
+
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return peak, elapsed
+
+
+def pipeline(path, f, strict=True):
+    """Write statements as each section is read."""
+    for statement in iter_statements(path, filters=FILTERS, strict=strict):
+        f.write(statement)
+        f.write("\n\n")
+
+
+def pipeline_not_strict(path, f):
+    """Write statements as each section is read, without keeping section names to check for duplicates."""
+    pipeline(path, f, strict=False)
+
+
+def staged(path, f):
+    """Load, filter, and output the commands in stages, as was done before the pipeline was available."""
+    commands = filter_commands(load_commands(path), environments=FILTERS['environments'])
+
+    output = list()
+    for command in commands:
+        output.append(command.get_statement(cd=True))
+        output.append("")
+
+    f.write("\n".join(output))
+
+
+def write_config(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write("[create directory %s]\n" % i)
+            f.write("mkdir: /var/www/%s\n" % i)
+            f.write("env: %s\n" % ("live" if i % 2 else "staging"))
+            f.write("mode: 755\n")
+            f.write("tags: web, setup\n\n")
+
+
+def main(count=100000):
+    directory = tempfile.mkdtemp()
+
+    print("%-10s %-20s %12s %10s" % ("sections", "", "peak (KB)", "seconds"))
+    for _count in (count // 100, count // 10, count):
+        path = os.path.join(directory, "commands_%s.ini" % _count)
+        write_config(path, _count)
+
+        callbacks = (
+            ("staged", staged),
+            ("pipeline", pipeline),
+            ("pipeline, not strict", pipeline_not_strict),
+        )
+        for label, callback in callbacks:
+            peak, elapsed = measure(callback, path)
+            print("%-10s %-20s %12.1f %10.3f" % (_count, label, peak / 1024, elapsed))
+
+        os.remove(path)
+
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,313 @@
+# Imports
+
+from hashlib import sha256
+import json
+import logging
+import os
+import tempfile
+from .constants import LOGGER_NAME
+from .library.commands import ItemizedCommand
+from .library.commands.templates import Template
+from .version import VERSION
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "DEFAULT_MAX_SIZE",
+    "get_dependencies",
+    "get_key",
+    "RenderCache",
+)
+
+# Constants
+
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+"""The default maximum size (in bytes) of the render cache."""
+
+# Functions
+
+
+def get_dependencies(commands):
+    """Get the paths of the files, other than the configuration file itself, that contribute to the output of the
+    given commands.
+
+    :param commands: The commands to be checked.
+    :type commands: list
+
+    :rtype: list[str]
+    :returns: The absolute path of each file.
+
+    .. note::
+        Files that are included by a template (for example, with Jinja's ``include`` tag) are not detected.
+
+    """
+    paths = list()
+    for command in commands:
+        if isinstance(command, Template):
+            paths.append(os.path.abspath(command.get_template()))
+        elif isinstance(command, ItemizedCommand) and command.items_from is not None:
+            paths.append(os.path.abspath(command.items_from))
+        else:
+            pass
+
+    return paths
+
+
+def get_key(path, mode, context=None, filters=None, locations=None, options=None, overlay="ubuntu"):
+    """Get the key for the output of a configuration file.
+
+    :param path: The path to the configuration file.
+    :type path: str
+
+    :param mode: The kind of output, for example ``commands`` or ``script``.
+    :type mode: str
+
+    :param context: The context used to pre-process the file and templates.
+    :type context: dict
+
+    :param filters: The filters applied to the commands.
+    :type filters: dict
+
+    :param locations: The template locations.
+    :type locations: list[str]
+
+    :param options: Options applied to all commands.
+    :type options: dict
+
+    :param overlay: The name of the overlay used to generate commands.
+    :type overlay: str
+
+    :rtype: str | None
+    :returns: The key or ``None`` if the configuration file could not be read.
+
+    """
+    try:
+        with open(path, "rb") as f:
+            content_hash = sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+    parts = {
+        'content': content_hash,
+        'context': dict(context) if context is not None else None,
+        'filters': filters,
+        'locations': locations,
+        'mode': mode,
+        'options': options,
+        'overlay': overlay,
+        'path': os.path.abspath(path),
+        'version': VERSION,
+    }
+
+    return sha256(json.dumps(parts, default=str, sort_keys=True).encode("utf-8")).hexdigest()
+
+# Classes
+
+
+class RenderCache(object):
+    """A content-addressed cache of rendered output, kept on disk so that it may be shared between runs.
+
+    Each entry is stored in a file named for its key. The entry includes the modification time and size of each file
+    on which the output depends, and the entry is discarded when any of these have changed. Entries are written to a
+    temporary file and then renamed, so processes using the same cache never see a partially written entry.
+
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        """Initialize the cache.
+
+        :param path: The path to the directory where entries are stored. It is created if it does not exist.
+        :type path: str
+
+        :param max_size: The maximum size of the cache in bytes. The least recently used entries are removed once this
+                         size is exceeded.
+        :type max_size: int
+
+        """
+        self.max_size = max_size
+        self.path = path
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.path)
+
+    def clear(self):
+        """Remove all entries from the cache.
+
+        :rtype: int
+        :returns: The number of entries removed.
+
+        """
+        count = 0
+        for entry_path, mtime, size in self._get_entries():
+            if self._remove(entry_path):
+                count += 1
+
+        return count
+
+    def get(self, key):
+        """Get the output stored for a key.
+
+        :param key: The key. See ``get_key()``.
+        :type key: str
+
+        :rtype: str | None
+        :returns: The output or ``None`` if the entry does not exist or is no longer valid.
+
+        """
+        entry_path = self._get_entry_path(key)
+
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for path, mtime, size in entry.get("dependencies", list()):
+            if self._stat(path) != [mtime, size]:
+                log.debug("Render cache entry is out of date because %s has changed: %s" % (path, key))
+                self._remove(entry_path)
+                return None
+
+        # The modification time of the entry records when it was last used.
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return entry.get("output")
+
+    # noinspection PyMethodMayBeStatic
+    def get_key(self, path, mode, context=None, filters=None, locations=None, options=None, overlay="ubuntu"):
+        """Get the key for the output of a configuration file. See ``get_key()``."""
+        return get_key(path, mode, context=context, filters=filters, locations=locations, options=options,
+                       overlay=overlay)
+
+    def prune(self):
+        """Remove the least recently used entries until the cache is no larger than the maximum size.
+
+        :rtype: int
+        :returns: The number of entries removed.
+
+        """
+        entries = self._get_entries()
+
+        total = sum([size for entry_path, mtime, size in entries])
+        if total <= self.max_size:
+            return 0
+
+        count = 0
+        for entry_path, mtime, size in sorted(entries, key=lambda x: x[1]):
+            if total <= self.max_size:
+                break
+
+            if self._remove(entry_path):
+                count += 1
+
+            total -= size
+
+        log.debug("Removed %s entries from the render cache." % count)
+
+        return count
+
+    def set(self, key, output, dependencies=None):
+        """Store the output for a key.
+
+        :param key: The key. See ``get_key()``.
+        :type key: str
+
+        :param output: The output to be stored.
+        :type output: str
+
+        :param dependencies: The paths of files on which the output depends.
+        :type dependencies: list[str]
+
+        :rtype: bool
+
+        """
+        entry = {
+            'dependencies': [[path] + self._stat(path) for path in dependencies or list()],
+            'output': output,
+        }
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+
+            handle, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(handle, "w") as f:
+                json.dump(entry, f)
+
+            os.replace(temp_path, self._get_entry_path(key))
+        except OSError as e:
+            log.warning("Could not write to render cache %s: %s" % (self.path, e))
+            return False
+
+        self.prune()
+
+        return True
+
+    def _get_entries(self):
+        """Get the entries currently in the cache.
+
+        :rtype: list[tuple]
+        :returns: The path, modification time, and size of each entry.
+
+        """
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return list()
+
+        entries = list()
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+
+            entry_path = os.path.join(self.path, name)
+
+            # Another process may remove the entry at any time.
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+
+            entries.append((entry_path, stat.st_mtime, stat.st_size))
+
+        return entries
+
+    def _get_entry_path(self, key):
+        """Get the path to the file for a given key.
+
+        :rtype: str
+
+        """
+        return os.path.join(self.path, "%s.json" % key)
+
+    # noinspection PyMethodMayBeStatic
+    def _remove(self, entry_path):
+        """Remove an entry, ignoring entries that have already been removed by another process.
+
+        :rtype: bool
+
+        """
+        try:
+            os.remove(entry_path)
+            return True
+        except OSError:
+            return False
+
+    # noinspection PyMethodMayBeStatic
+    def _stat(self, path):
+        """Get the modification time and size of a dependency.
+
+        :rtype: list
+        :returns: The modification time (in nanoseconds) and size, or ``[None, None]`` if the file does not exist.
+
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return [None, None]
+
+        return [stat.st_mtime_ns, stat.st_size]
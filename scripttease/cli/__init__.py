@@ -1,17 +1,12 @@
 # Imports
 
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
-from commonkit.logging import LoggingHelper
+from collections import ChainMap
 from ..constants import LOGGER_NAME
 from ..version import DATE as VERSION_DATE, VERSION
-from . import initialize
-from . import subcommands
 
 DEBUG = 10
 
-logging = LoggingHelper(colorize=True, name=LOGGER_NAME)
-log = logging.setup()
-
 # Commands
 
 
@@ -37,6 +32,13 @@ This command is used to parse configuration files and output the commands.
         help="The path to the configuration file."
     )
 
+    parser.add_argument(
+        "--batch=",
+        dest="manifest_path",
+        help="Render each of the jobs in the given JSON lines (.jsonl) or INI manifest instead of a single file. Other "
+             "options are used for jobs that do not define them."
+    )
+
     parser.add_argument(
         "-c",
         "--color",
@@ -53,6 +55,12 @@ This command is used to parse configuration files and output the commands.
         help="Context variables for use in pre-parsing the config and templates. In the form of: name:value"
     )
 
+    parser.add_argument(
+        "--cache-dir=",
+        dest="cache_path",
+        help="Cache compiled templates and rendered output in the given directory for reuse by later runs."
+    )
+
     parser.add_argument(
         "-d",
         "--docs",
@@ -82,7 +90,15 @@ This command is used to parse configuration files and output the commands.
         "--filter=",
         action="append",
         dest="filters",
-        help="Filter the commands in the form of: attribute:value"
+        help="Filter the commands in the form of: attribute:value, or with an expression such as: "
+             "'env:live and (tags:web or tags:django) and not comment:\"install *\"'"
+    )
+
+    parser.add_argument(
+        "--jobs=",
+        dest="jobs",
+        type=int,
+        help="The number of processes used to render the jobs of a --batch. Defaults to the number of CPUs."
     )
 
     parser.add_argument(
@@ -101,6 +117,13 @@ This command is used to parse configuration files and output the commands.
     #     help="Output to the given directory. Defaults to ./prototype/output/"
     # )
 
+    parser.add_argument(
+        "--parallel=",
+        choices=["process", "thread"],
+        dest="executor",
+        help="Render templates concurrently using a pool of processes or threads."
+    )
+
     parser.add_argument(
         "-s",
         "--script",
@@ -109,6 +132,13 @@ This command is used to parse configuration files and output the commands.
         help="Output commands as a script."
     )
 
+    parser.add_argument(
+        "--serve=",
+        dest="socket_path",
+        help="Listen for render requests on the given Unix socket instead of rendering a file. Use the client in "
+             "scripttease.client to send requests."
+    )
+
     parser.add_argument(
         "-T=",
         "--template-path=",
@@ -121,7 +151,7 @@ This command is used to parse configuration files and output the commands.
         "-w=",
         "--write=",
         dest="output_file",
-        help="Write the output to disk."
+        help="Write the output to the given file instead of standard output."
     )
 
     parser.add_argument(
@@ -131,6 +161,13 @@ This command is used to parse configuration files and output the commands.
         help="Load variables from a file."
     )
 
+    parser.add_argument(
+        "--workers=",
+        dest="workers",
+        type=int,
+        help="The maximum number of workers used to render templates with --parallel."
+    )
+
     # Access to the version number requires special consideration, especially
     # when using sub parsers. The Python 3.3 behavior is different. See this
     # answer: http://stackoverflow.com/questions/8521612/argparse-optional-subparser-for-version
@@ -151,26 +188,73 @@ This command is used to parse configuration files and output the commands.
     # Parse arguments.
     args = parser.parse_args()
 
+    # Other modules are imported only once the arguments have been parsed, so that showing help or the version is fast.
+    # Importing commonkit (which also imports Jinja and Pygments) takes most of the time to start.
+    from commonkit.logging import LoggingHelper
+    from commonkit.shell import EXIT
+
+    logging = LoggingHelper(colorize=True, name=LOGGER_NAME)
+    log = logging.setup()
+
     if args.debug_enabled:
         log.setLevel(DEBUG)
 
     log.debug("Namespace: %s" % args)
 
-    # Load context.
-    context = dict()
+    # Run as a server.
+    if args.socket_path:
+        from .server import serve
+        exit(serve(args.socket_path, cache_path=args.cache_path))
+
+    # Render the jobs of a manifest.
+    if args.manifest_path:
+        from . import batch
+
+        if args.docs_enabled:
+            mode = "docs"
+        elif args.script_enabled:
+            mode = "script"
+        else:
+            mode = "commands"
+
+        defaults = {
+            'filters': args.filters,
+            'locations': args.template_locations,
+            'mode': mode,
+            'options': args.options,
+            'variables': args.variables,
+            'variables_file': args.variables_file,
+        }
+
+        jobs = batch.load_manifest(args.manifest_path, defaults=defaults)
+        if jobs is None:
+            exit(EXIT.ERROR)
+
+        exit(batch.run_batch(jobs, cache_path=args.cache_path, workers=args.jobs))
+
+    from . import initialize
+    from . import subcommands
+
+    # Load context. Variables given on the command line take precedence over those loaded from a file. The layers are
+    # searched in order rather than being copied into a single dictionary.
+    context = ChainMap()
     if args.variables:
-        context = initialize.context_from_cli(args.variables)
+        context.maps.insert(0, initialize.context_from_cli(args.variables))
 
     # Load additional context from file.
     if args.variables_file:
         variables = initialize.variables_from_file(args.variables_file)
         if variables:
-            context.update(variables)
+            context.maps.append(variables)
 
     # Handle filters.
     filters = None
     if args.filters:
-        filters = initialize.filters_from_cli(args.filters)
+        try:
+            filters = initialize.filters_from_cli(args.filters)
+        except ValueError as e:
+            log.error("Invalid filter: %s" % e)
+            exit(EXIT.ERROR)
 
     # Handle options.
     options = None
@@ -181,27 +265,37 @@ This command is used to parse configuration files and output the commands.
     if args.docs_enabled:
         exit_code = subcommands.output_docs(
             args.path,
+            cache_path=args.cache_path,
             context=context,
             filters=filters,
             locations=args.template_locations,
-            options=options
+            options=options,
+            output_file=args.output_file
         )
     elif args.script_enabled:
         exit_code = subcommands.output_script(
             args.path,
+            cache_path=args.cache_path,
             color_enabled=args.color_enabled,
             context=context,
+            executor=args.executor,
             locations=args.template_locations,
-            options=options
+            options=options,
+            output_file=args.output_file,
+            workers=args.workers
         )
     else:
         exit_code = subcommands.output_commands(
             args.path,
+            cache_path=args.cache_path,
             color_enabled=args.color_enabled,
             context=context,
+            executor=args.executor,
             filters=filters,
             locations=args.template_locations,
-            options=options
+            options=options,
+            output_file=args.output_file,
+            workers=args.workers
         )
 
     exit(exit_code)
@@ -0,0 +1,310 @@
+# Imports
+
+from commonkit import split_csv
+from commonkit.shell import EXIT
+from configparser import Error as ConfigParserError, RawConfigParser
+import json
+import logging
+import os
+import sys
+import time
+from ..constants import LOGGER_NAME
+from .initialize import context_from_cli
+from .renderer import Renderer
+from .subcommands import write_file
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "load_manifest",
+    "run_batch",
+)
+
+# Constants
+
+LIST_KEYS = ("context", "filters", "locations", "options", "variables")
+"""The keys of an INI manifest that are given as comma-separated lists. The ``context`` is given as ``name:value``
+pairs, in the same way as the ``variables``."""
+
+PATH_KEYS = ("output_file", "path", "variables_file")
+"""The keys of a job that are paths. A relative path is relative to the manifest."""
+
+# Caches
+
+_renderer = None
+"""The renderer of the current process, which is used for every job run by the process."""
+
+# Functions
+
+
+def load_manifest(path, defaults=None):
+    """Load the jobs of a batch.
+
+    :param path: The path to the manifest. JSON lines (``.jsonl``) and INI (``.ini``) files are supported.
+    :type path: str
+
+    :param defaults: Values used for each job that does not define them.
+    :type defaults: dict
+
+    :rtype: list[dict] | None
+    :returns: The jobs, or ``None`` if the manifest could not be loaded.
+
+    A job has the same keys as a request to the server (see ``scripttease.client.render()``), as well as a ``name`` and
+    an ``output_file``.
+
+    """
+    if not os.path.exists(path):
+        log.warning("Manifest does not exist: %s" % path)
+        return None
+
+    if path.endswith(".jsonl"):
+        jobs = _load_jsonl(path)
+    elif path.endswith(".ini"):
+        jobs = _load_ini(path)
+    else:
+        log.warning("Manifest format is not currently supported: %s" % path)
+        return None
+
+    if jobs is None:
+        return None
+
+    directory = os.path.dirname(os.path.abspath(path))
+
+    a = list()
+    for job in jobs:
+        if not job.get("path"):
+            log.error("Job %s of %s does not include the path to a configuration file." % (job['name'], path))
+            return None
+
+        for key in PATH_KEYS:
+            if job.get(key):
+                job[key] = os.path.join(directory, job[key])
+
+        if job.get("locations"):
+            job['locations'] = [os.path.join(directory, location) for location in job['locations']]
+
+        _job = {key: value for key, value in (defaults or dict()).items() if value is not None}
+        _job.update(job)
+
+        a.append(_job)
+
+    return a
+
+
+def run_batch(jobs, cache_path=None, workers=None):
+    """Render the jobs of a batch using a pool of processes.
+
+    :param jobs: The jobs loaded from a manifest.
+    :type jobs: list[dict]
+
+    :param cache_path: The path to a directory where compiled templates are cached.
+    :type cache_path: str
+
+    :param workers: The number of processes. Defaults to the number of CPUs. When ``1``, the jobs are run in the
+                    current process.
+    :type workers: int
+
+    :rtype: int
+    :returns: An exit code.
+
+    The output of a job without an ``output_file`` is written to standard output in the order of the manifest. A
+    summary of the time taken by each job is written to standard error once all of the jobs have been run.
+
+    """
+    # There is no need for more processes than jobs.
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+
+    start = time.perf_counter()
+
+    results = list()
+    for result in _iter_results(jobs, cache_path=cache_path, workers=workers):
+        if result['output'] is not None:
+            sys.stdout.write(result['output'])
+            sys.stdout.write("\n")
+
+        # The output is not kept once it has been written.
+        del result['output']
+        results.append(result)
+
+    seconds = time.perf_counter() - start
+
+    _write_summary(results, seconds, workers)
+
+    for result in results:
+        if result['exit_code'] != EXIT.OK:
+            return EXIT.ERROR
+
+    return EXIT.OK
+
+
+def _init_worker(cache_path=None):
+    """Create the renderer of the current process. Configurations, overlays, and Jinja environments are then shared by
+    the jobs run by the process.
+
+    :param cache_path: The path to a directory where compiled templates are cached.
+    :type cache_path: str
+
+    """
+    global _renderer
+
+    _renderer = Renderer(cache_path=cache_path)
+
+
+def _iter_results(jobs, cache_path=None, workers=1):
+    """Run the jobs of a batch.
+
+    :rtype: collections.Iterable[dict]
+    :returns: The result of each job, in the order of the jobs.
+
+    """
+    if workers == 1:
+        _init_worker(cache_path)
+        for job in jobs:
+            yield _run_job(job)
+
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_path,)) as pool:
+        for result in pool.map(_run_job, jobs):
+            yield result
+
+
+def _load_ini(path):
+    """Load the jobs of an INI manifest. Each section is a job, and the section name is the name of the job. Values
+    given as lists (see ``LIST_KEYS``) are separated by commas.
+
+    :rtype: list[dict] | None
+
+    """
+    ini = RawConfigParser()
+    try:
+        ini.read(path)
+    except ConfigParserError as e:
+        log.error("Failed to parse %s as an INI manifest: %s" % (path, e))
+        return None
+
+    jobs = list()
+    for section in ini.sections():
+        job = {'name': section}
+        for key, value in ini.items(section):
+            if key in LIST_KEYS:
+                job[key] = split_csv(value, smart=False)
+            else:
+                job[key] = value
+
+        if "context" in job:
+            try:
+                job['context'] = context_from_cli(job['context'])
+            except ValueError:
+                log.error("The context of job %s in %s must be given as name:value pairs." % (section, path))
+                return None
+
+        jobs.append(job)
+
+    return jobs
+
+
+def _load_jsonl(path):
+    """Load the jobs of a JSON lines manifest. Each line is a job, and the name of a job defaults to the line number.
+
+    :rtype: list[dict] | None
+
+    """
+    jobs = list()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                log.error("Invalid job on line %s of %s: %s" % (number, path, e))
+                return None
+
+            if not isinstance(job, dict):
+                log.error("Job on line %s of %s is not an object." % (number, path))
+                return None
+
+            job['name'] = str(job.get("name") or number)
+            jobs.append(job)
+
+    return jobs
+
+
+def _run_job(job):
+    """Run a job using the renderer of the current process.
+
+    :param job: The job.
+    :type job: dict
+
+    :rtype: dict
+    :returns: The ``name``, ``exit_code``, ``errors``, and ``seconds`` of the job, and the ``output`` when it has not
+              been written to a file.
+
+    """
+    start = time.perf_counter()
+
+    # A job that fails unexpectedly must not stop the other jobs of the batch.
+    try:
+        result = _renderer.render(job)
+    except Exception as e:
+        log.exception("Could not render job %s: %s" % (job['name'], e))
+        result = {
+            'errors': [str(e)],
+            'exit_code': EXIT.ERROR,
+            'output': None,
+        }
+
+    if result['output'] is not None and job.get("output_file"):
+        if not write_file(job['output_file'], [result['output']]):
+            result['errors'].append("Could not write to %s" % job['output_file'])
+            result['exit_code'] = EXIT.ERROR
+
+        result['output'] = None
+
+    result['name'] = job['name']
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def _write_summary(results, seconds, workers):
+    """Write the time taken by each job, and the errors of any that failed, to standard error.
+
+    :param results: The results of the jobs.
+    :type results: list[dict]
+
+    :param seconds: The time taken by the batch.
+    :type seconds: float
+
+    :param workers: The number of processes.
+    :type workers: int
+
+    """
+    width = max([len("job")] + [len(result['name']) for result in results])
+
+    lines = list()
+    lines.append("%s  %-6s  %9s" % ("job".ljust(width), "status", "seconds"))
+
+    failed = 0
+    for result in results:
+        if result['exit_code'] == EXIT.OK:
+            status = "ok"
+        else:
+            failed += 1
+            status = "failed"
+
+        lines.append("%s  %-6s  %9.3f" % (result['name'].ljust(width), status, result['seconds']))
+        for error in result['errors']:
+            lines.append("    %s" % error)
+
+    lines.append("")
+    lines.append("%s jobs, %s failed, %.3f seconds, %s workers" % (len(results), failed, seconds, workers))
+
+    sys.stderr.write("\n".join(lines))
+    sys.stderr.write("\n")
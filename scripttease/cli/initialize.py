@@ -5,6 +5,7 @@ from configparser import ConfigParser
 import logging
 import os
 from ..constants import LOGGER_NAME
+from ..parsers.filters import compile_filter, is_expression, ATTRIBUTES
 
 log = logging.getLogger(LOGGER_NAME)
 
@@ -42,21 +43,40 @@ def context_from_cli(variables):
 def filters_from_cli(filters):
     """Takes a list of filters given in the form of ``name:value`` and converts them to a dictionary.
 
-    :param filters: A list of strings of ``attribute:value`` pairs.
+    :param filters: A list of strings of ``attribute:value`` pairs or filter expressions.
     :type filters: list[str]
 
-    :rtype: dict
+    :rtype: dict | scripttease.parsers.filters.Filter
+
+    :raise: ValueError
+    :raises: ``ValueError`` if a filter is not valid.
+
+    Values given for the same attribute are alternatives, while different attributes must all match. When a filter is
+    an expression (see ``compile_filter()``) or refers to an attribute other than environments or tags, the filters
+    are instead compiled to a single expression in which each filter must match.
 
     """
     _filters = dict()
+    expressions = list()
     for i in filters:
-        key, value = i.split(":")
-        if key not in filters:
+        if is_expression(i):
+            expressions.append(i)
+            continue
+
+        key, value = i.split(":", 1)
+        key = ATTRIBUTES[key.strip().lower()]
+        if key not in _filters:
             _filters[key] = list()
 
         _filters[key].append(value)
 
-    return _filters
+    if not expressions and set(_filters.keys()).issubset({"environments", "tags"}):
+        return _filters
+
+    for key, values in _filters.items():
+        expressions.append(" or ".join(["%s:%s" % (key, value) for value in values]))
+
+    return compile_filter(" and ".join(["(%s)" % e for e in expressions]))
 
 
 def options_from_cli(options):
@@ -0,0 +1,261 @@
+# Imports
+
+from collections import ChainMap, OrderedDict
+from commonkit.shell import EXIT
+import logging
+import os
+from ..cache import get_dependencies, get_key
+from ..constants import LOGGER_NAME
+from ..parsers import load_config
+from . import initialize
+from .subcommands import iter_commands_output, iter_docs_output
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "MAX_CONFIGS",
+    "MODES",
+    "REQUEST_TYPES",
+    "Renderer",
+)
+
+# Constants
+
+MAX_CONFIGS = 64
+"""The maximum number of loaded configurations kept by a renderer."""
+
+MODES = ("commands", "docs", "script")
+"""The kinds of output that may be requested."""
+
+REQUEST_TYPES = {
+    'context': dict,
+    'filters': list,
+    'locations': list,
+    'mode': str,
+    'options': (dict, list),
+    'overlay': str,
+    'path': str,
+    'variables': list,
+    'variables_file': str,
+}
+"""The type of each value of a request. Lists must contain strings."""
+
+# Functions
+
+
+def _stat(path):
+    """Get the modification time and size of a file.
+
+    :rtype: tuple | None
+
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _validate(request):
+    """Check the types of the values of a request.
+
+    :param request: The request.
+    :type request: dict
+
+    :rtype: str | None
+    :returns: An error message, or ``None`` if the request is valid.
+
+    """
+    for key, kind in REQUEST_TYPES.items():
+        value = request.get(key)
+        if value is None:
+            continue
+
+        if not isinstance(value, kind):
+            return "%s may not be a %s" % (key, type(value).__name__)
+
+        if isinstance(value, list) and not all([isinstance(i, str) for i in value]):
+            return "%s must be a list of strings" % key
+
+    return None
+
+# Classes
+
+
+class Renderer(object):
+    """Renders configuration files on request, keeping loaded configurations so that they may be used again.
+
+    A request is a dictionary. See ``scripttease.client.render()`` for the keys. Overlays and Jinja environments (and
+    the templates they have compiled) are shared by every renderer in the process.
+
+    """
+
+    def __init__(self, cache_path=None, max_configs=MAX_CONFIGS):
+        """Initialize the renderer.
+
+        :param cache_path: The path to a directory where compiled templates are cached.
+        :type cache_path: str
+
+        :param max_configs: The maximum number of loaded configurations to keep. The least recently used configuration
+                            is discarded when this is exceeded.
+        :type max_configs: int
+
+        """
+        self.cache_path = cache_path
+        self.configs = OrderedDict()
+        self.max_configs = max_configs
+
+    def __repr__(self):
+        return "<%s (%s)>" % (self.__class__.__name__, len(self.configs))
+
+    def render(self, request):
+        """Render a configuration file.
+
+        :param request: The request.
+        :type request: dict
+
+        :rtype: dict
+        :returns: The ``exit_code``, the ``output`` (or ``None`` when an error occurs), and a list of the ``errors``
+                  that were logged.
+
+        """
+        handler = _ErrorCollector()
+        log.addHandler(handler)
+
+        try:
+            output = self._render(request)
+        finally:
+            log.removeHandler(handler)
+
+        return {
+            'errors': handler.errors,
+            'exit_code': EXIT.ERROR if output is None else EXIT.OK,
+            'output': output,
+        }
+
+    def _get_config(self, path, context=None, filters=None, locations=None, options=None, overlay="ubuntu"):
+        """Get a loaded configuration, using the configuration loaded by an earlier request when the file, the other
+        arguments, and the files used by the configuration are unchanged.
+
+        :rtype: scripttease.parsers.base.Parser | None
+
+        """
+        key = get_key(path, "config", context=context, filters=filters, locations=locations, options=options,
+                      overlay=overlay)
+        if key is None:
+            log.error("Configuration file could not be read: %s" % path)
+            return None
+
+        if key in self.configs:
+            config, dependencies = self.configs[key]
+            if all([_stat(p) == stat for p, stat in dependencies]):
+                self.configs.move_to_end(key)
+                return config
+
+            del self.configs[key]
+
+        config = load_config(
+            path,
+            overlay=overlay,
+            cache_path=self.cache_path,
+            context=context,
+            filters=filters,
+            locations=locations,
+            options=options
+        )
+        if config is None:
+            return None
+
+        # noinspection PyProtectedMember
+        dependencies = [(p, _stat(p)) for p in get_dependencies(config._commands)]
+
+        self.configs[key] = (config, dependencies)
+        while len(self.configs) > self.max_configs:
+            self.configs.popitem(last=False)
+
+        return config
+
+    def _render(self, request):
+        """Render the output of a request.
+
+        :rtype: str | None
+
+        """
+        if not isinstance(request, dict) or not request.get("path"):
+            log.error("A request must include the path to a configuration file.")
+            return None
+
+        error = _validate(request)
+        if error is not None:
+            log.error("Invalid request: %s" % error)
+            return None
+
+        mode = request.get("mode") or "commands"
+        if mode not in MODES:
+            log.error("Unrecognized or unsupported mode: %s" % mode)
+            return None
+
+        # As with the tease command, variables given as name:value take precedence over those loaded from a file.
+        context = ChainMap(dict(request.get("context") or dict()))
+        if request.get("variables"):
+            try:
+                context.maps.insert(0, initialize.context_from_cli(request["variables"]))
+            except ValueError:
+                log.error("Variables must be given as name:value: %s" % ", ".join(request["variables"]))
+                return None
+
+        if request.get("variables_file"):
+            variables = initialize.variables_from_file(request["variables_file"])
+            if variables:
+                context.maps.append(variables)
+
+        # Filters are not implemented for scripts.
+        filters = None
+        if request.get("filters") and mode != "script":
+            try:
+                filters = initialize.filters_from_cli(request["filters"])
+            except ValueError as e:
+                log.error("Invalid filter: %s" % e)
+                return None
+
+        options = request.get("options") or None
+        if isinstance(options, list):
+            try:
+                options = initialize.options_from_cli(options)
+            except ValueError:
+                log.error("Options must be given as name:value: %s" % ", ".join(options))
+                return None
+
+        config = self._get_config(
+            request["path"],
+            context=context,
+            filters=filters,
+            locations=request.get("locations") or None,
+            options=options,
+            overlay=request.get("overlay") or "ubuntu"
+        )
+        if config is None:
+            return None
+
+        if mode == "docs":
+            return "".join(iter_docs_output(config.get_commands()))
+
+        if mode == "script":
+            return config.as_script().to_string()
+
+        return "".join(iter_commands_output(config.get_commands()))
+
+
+class _ErrorCollector(logging.Handler):
+    """Collects the errors logged while a request is rendered."""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+
+        self.errors = list()
+
+    def emit(self, record):
+        self.errors.append(record.getMessage())
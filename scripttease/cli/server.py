@@ -0,0 +1,182 @@
+# Imports
+
+from commonkit.shell import EXIT
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+from ..constants import LOGGER_NAME
+from .renderer import MAX_CONFIGS, Renderer
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "serve",
+    "RenderServer",
+)
+
+# Functions
+
+
+def serve(socket_path, cache_path=None, max_configs=MAX_CONFIGS):
+    """Listen for render requests on a Unix socket until interrupted. See ``RenderServer``.
+
+    :param socket_path: The path to the socket.
+    :type socket_path: str
+
+    :param cache_path: The path to a directory where compiled templates are cached.
+    :type cache_path: str
+
+    :param max_configs: The maximum number of loaded configurations to keep.
+    :type max_configs: int
+
+    :rtype: int
+    :returns: An exit code.
+
+    """
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            log.error("A server is already listening on %s" % socket_path)
+            return EXIT.ERROR
+
+        # The socket was left behind by a server that did not exit cleanly.
+        os.remove(socket_path)
+
+    try:
+        server = RenderServer(socket_path, cache_path=cache_path, max_configs=max_configs)
+    except OSError as e:
+        log.error("Could not listen on %s: %s" % (socket_path, e))
+        return EXIT.ERROR
+
+    log.info("Listening for render requests on %s" % socket_path)
+
+    # The server also stops cleanly when it is terminated.
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return EXIT.OK
+
+
+# noinspection PyUnusedLocal
+def _interrupt(signum, frame):
+    """Stop the server in the same way as a keyboard interrupt."""
+    raise KeyboardInterrupt()
+
+
+def _is_listening(socket_path):
+    """Indicates whether a server is listening on the given socket.
+
+    :rtype: bool
+
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        connection.close()
+
+    return True
+
+# Classes
+
+
+class RenderServer(socketserver.UnixStreamServer):
+    """A long-lived server that renders configuration files on request.
+
+    Overlays, Jinja environments (and the templates they have compiled), and loaded configurations are kept between
+    requests, so a request takes far less time than running the ``tease`` command.
+
+    Each connection sends one request as a line of JSON and receives one response as a line of JSON. See
+    ``scripttease.client.render()`` for the keys of a request. The response includes the ``exit_code``, the ``output``
+    (or ``None`` when an error occurs), and a list of the ``errors`` that were logged.
+
+    Requests are handled one at a time. The socket may only be used by the user that started the server.
+
+    """
+
+    def __init__(self, socket_path, cache_path=None, max_configs=MAX_CONFIGS):
+        """Initialize the server.
+
+        :param socket_path: The path to the socket.
+        :type socket_path: str
+
+        :param cache_path: The path to a directory where compiled templates are cached.
+        :type cache_path: str
+
+        :param max_configs: The maximum number of loaded configurations to keep. The least recently used configuration
+                            is discarded when this is exceeded.
+        :type max_configs: int
+
+        """
+        self.renderer = Renderer(cache_path=cache_path, max_configs=max_configs)
+        self.socket_path = socket_path
+
+        super().__init__(socket_path, RenderRequestHandler)
+
+    def server_bind(self):
+        # The server may read any file that its user may read, so other users may not connect. The socket is created
+        # with these permissions, so that there is no time at which others could connect.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def render(self, request):
+        """Render a configuration file. See ``Renderer.render()``.
+
+        :param request: The request.
+        :type request: dict
+
+        :rtype: dict
+        :returns: The response.
+
+        """
+        return self.renderer.render(request)
+
+
+class RenderRequestHandler(socketserver.StreamRequestHandler):
+    """Handles a connection to the ``RenderServer``."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError as e:
+            response = {
+                'errors': ["Invalid request: %s" % e],
+                'exit_code': EXIT.ERROR,
+                'output': None,
+            }
+        else:
+            # A response is always sent, so the client is not left without one when rendering fails unexpectedly.
+            try:
+                response = self.server.render(request)
+            except Exception as e:
+                log.exception("Could not render request: %s" % e)
+                response = {
+                    'errors': ["Could not render request: %s" % e],
+                    'exit_code': EXIT.ERROR,
+                    'output': None,
+                }
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
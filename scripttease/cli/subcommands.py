@@ -1,32 +1,96 @@
 # Imports
 
-from commonkit import highlight_code
 from commonkit.shell import EXIT
+import logging
+import os
+import sys
+import tempfile
+from ..cache import get_dependencies, RenderCache
+from ..constants import LOGGER_NAME
+from ..library.commands.templates import render_templates, Template
 from ..parsers import load_commands, load_config
 
+log = logging.getLogger(LOGGER_NAME)
+
 # Exports
 
 __all__ = (
+    "iter_commands_output",
+    "iter_docs_output",
     "output_commands",
     "output_docs",
     "output_script",
+    "write_file",
 )
 
+# Constants
+
+RENDER_CACHE_DIRECTORY = "renders"
+"""The directory, relative to the cache path, where rendered output is cached."""
+
 # Functions
 
 
-def output_commands(path, color_enabled=False, context=None, filters=None, locations=None, options=None):
+def iter_commands_output(commands):
+    """Get the output of commands, in chunks.
+
+    :param commands: The commands to be output.
+    :type commands: list
+
+    :rtype: collections.Iterable[str]
+
+    """
+    started = False
+    for command in commands:
+        statement = command.get_statement(cd=True)
+        if statement is None:
+            continue
+
+        if started:
+            yield "\n"
+
+        started = True
+        yield statement
+        yield "\n"
+
+
+def iter_docs_output(commands):
+    """Get the documentation of commands, in chunks.
+
+    :param commands: The commands to be documented.
+    :type commands: list
+
+    :rtype: collections.Iterable[str]
+
+    """
+    count = 1
+    for command in commands:
+        if count > 1:
+            yield "\n"
+
+        yield "%s. %s" % (count, command.comment)
+        count += 1
+
+
+def output_commands(path, cache_path=None, color_enabled=False, context=None, executor=None, filters=None,
+                    locations=None, options=None, output_file=None, workers=None):
     """Output commands found in a given configuration file.
 
     :param path: The path to the configuration file.
     :type path: str
 
+    :param cache_path: The path to a directory where compiled templates and rendered output are cached.
+    :type cache_path: str
+
     :param color_enabled: Indicates the output should be colorized.
     :type color_enabled: bool
 
     :param context: The context to be applied to the file before parsing it as configuration.
     :type context: dict
 
+    :param executor: Render templates concurrently using a pool of ``thread`` or ``process`` workers.
+    :type executor: str
+
     :param filters: Output only those commands which match the given filters.
     :type filters: dict
 
@@ -36,12 +100,27 @@ def output_commands(path, color_enabled=False, context=None, filters=None, locat
     :param options: Options to be applied to all commands.
     :type options: dict
 
+    :param output_file: Write the output to the given path instead of standard output. The file is replaced only once
+                        all of the output has been written.
+    :type output_file: str
+
+    :param workers: The maximum number of workers used to render templates.
+    :type workers: int
+
     :rtype: int
     :returns: An exit code.
 
     """
+    cache, key = _get_render_cache(path, "commands", cache_path, context=context, filters=filters,
+                                   locations=locations, options=options)
+    if key is not None:
+        output = cache.get(key)
+        if output is not None:
+            return _write([output], color_enabled=color_enabled, output_file=output_file)
+
     commands = load_commands(
         path,
+        cache_path=cache_path,
         context=context,
         filters=filters,
         locations=locations,
@@ -50,29 +129,27 @@ def output_commands(path, color_enabled=False, context=None, filters=None, locat
     if commands is None:
         return EXIT.ERROR
 
-    output = list()
-    for command in commands:
-        statement = command.get_statement(cd=True)
-        if statement is None:
-            continue
+    if executor is not None:
+        errors = render_templates([c for c in commands if isinstance(c, Template)], executor=executor, workers=workers)
+        if errors:
+            for template, error in errors:
+                log.error(error)
 
-        output.append(statement)
-        output.append("")
+            return EXIT.ERROR
 
-    if color_enabled:
-        print(highlight_code("\n".join(output), language="bash"))
-    else:
-        print("\n".join(output))
-
-    return EXIT.OK
+    return _write(iter_commands_output(commands), cache=cache, color_enabled=color_enabled,
+                  dependencies=get_dependencies(commands), key=key, output_file=output_file)
 
 
-def output_docs(path, context=None, filters=None, locations=None, options=None):
+def output_docs(path, cache_path=None, context=None, filters=None, locations=None, options=None, output_file=None):
     """Output documentation for commands found in a given configuration file.
 
     :param path: The path to the configuration file.
     :type path: str
 
+    :param cache_path: The path to a directory where compiled templates and rendered output are cached.
+    :type cache_path: str
+
     :param context: The context to be applied to the file before parsing it as configuration.
     :type context: dict
 
@@ -85,12 +162,24 @@ def output_docs(path, context=None, filters=None, locations=None, options=None):
     :param options: Options to be applied to all commands.
     :type options: dict
 
+    :param output_file: Write the output to the given path instead of standard output. The file is replaced only once
+                        all of the output has been written.
+    :type output_file: str
+
     :rtype: int
     :returns: An exit code.
 
     """
+    cache, key = _get_render_cache(path, "docs", cache_path, context=context, filters=filters, locations=locations,
+                                   options=options)
+    if key is not None:
+        output = cache.get(key)
+        if output is not None:
+            return _write([output], output_file=output_file)
+
     commands = load_commands(
         path,
+        cache_path=cache_path,
         context=context,
         filters=filters,
         locations=locations,
@@ -99,29 +188,30 @@ def output_docs(path, context=None, filters=None, locations=None, options=None):
     if commands is None:
         return EXIT.ERROR
 
-    count = 1
-    output = list()
-    for command in commands:
-        output.append("%s. %s" % (count, command.comment))
-        count += 1
+    # Templates are not rendered for documentation, so only items files affect the output.
+    return _write(iter_docs_output(commands), cache=cache, dependencies=get_dependencies(commands), key=key,
+                  output_file=output_file)
 
-    print("\n".join(output))
 
-    return EXIT.OK
-
-
-def output_script(path, color_enabled=False, context=None, filters=None, locations=None, options=None):
+def output_script(path, cache_path=None, color_enabled=False, context=None, executor=None, filters=None, locations=None,
+                  options=None, output_file=None, workers=None):
     """Output a script of commands found in a given configuration file.
 
     :param path: The path to the configuration file.
     :type path: str
 
+    :param cache_path: The path to a directory where compiled templates and rendered output are cached.
+    :type cache_path: str
+
     :param color_enabled: Indicates the output should be colorized.
     :type color_enabled: bool
 
     :param context: The context to be applied to the file before parsing it as configuration.
     :type context: dict
 
+    :param executor: Render templates concurrently using a pool of ``thread`` or ``process`` workers.
+    :type executor: str
+
     :param filters: Output only those commands which match the given filters. NOT IMPLEMENTED.
     :type filters: dict
 
@@ -131,12 +221,26 @@ def output_script(path, color_enabled=False, context=None, filters=None, locatio
     :param options: Options to be applied to all commands.
     :type options: dict
 
+    :param output_file: Write the output to the given path instead of standard output. The file is replaced only once
+                        all of the output has been written.
+    :type output_file: str
+
+    :param workers: The maximum number of workers used to render templates.
+    :type workers: int
+
     :rtype: int
     :returns: An exit code.
 
     """
+    cache, key = _get_render_cache(path, "script", cache_path, context=context, locations=locations, options=options)
+    if key is not None:
+        output = cache.get(key)
+        if output is not None:
+            return _write([output], color_enabled=color_enabled, output_file=output_file)
+
     config = load_config(
         path,
+        cache_path=cache_path,
         context=context,
         locations=locations,
         options=options
@@ -144,10 +248,157 @@ def output_script(path, color_enabled=False, context=None, filters=None, locatio
     if config is None:
         return EXIT.ERROR
 
-    script = config.as_script()
-    if color_enabled:
-        print(highlight_code(script.to_string(), language="bash"))
+    if executor is not None and not config.render_templates(executor=executor, workers=workers):
+        return EXIT.ERROR
+
+    # The script is written as it is exported rather than being built as a single string.
+    # noinspection PyProtectedMember
+    return _write(config.as_script().iter_chunks(), cache=cache, color_enabled=color_enabled,
+                  dependencies=get_dependencies(config._commands), key=key, output_file=output_file)
+
+
+def write_file(path, chunks):
+    """Write output to a file. The output is first written to a temporary file in the same directory, which then
+    replaces the given path so that a partially written file is never seen.
+
+    :param path: The path to the file.
+    :type path: str
+
+    :param chunks: The output, in chunks.
+    :type chunks: collections.Iterable[str]
+
+    :rtype: bool
+
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+
+    try:
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".%s." % os.path.basename(path), suffix=".tmp")
+    except OSError as e:
+        log.error("Could not write to %s: %s" % (path, e))
+        return False
+
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+            f.write("\n")
+
+        # mkstemp() creates the file as readable only by the owner. The mode of an existing file (for example, one that
+        # has been made executable) is kept.
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+
+        os.chmod(temp_path, mode)
+
+        os.replace(temp_path, path)
+    except OSError as e:
+        log.error("Could not write to %s: %s" % (path, e))
+        return False
+    finally:
+        # The temporary file remains only when the output could not be written.
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return True
+
+
+def _get_render_cache(path, mode, cache_path, **kwargs):
+    """Get the render cache and the key for the output of a configuration file.
+
+    :param path: The path to the configuration file.
+    :type path: str
+
+    :param mode: The kind of output.
+    :type mode: str
+
+    :param cache_path: The path to the cache directory. Output is not cached when this is ``None``.
+    :type cache_path: str
+
+    kwargs are passed to ``RenderCache.get_key()``.
+
+    :rtype: tuple
+    :returns: The cache and key, or ``(None, None)`` when output is not cached.
+
+    """
+    if cache_path is None:
+        return None, None
+
+    cache = RenderCache(os.path.join(cache_path, RENDER_CACHE_DIRECTORY))
+    key = cache.get_key(path, mode, **kwargs)
+    if key is None:
+        return None, None
+
+    return cache, key
+
+
+def _write(chunks, cache=None, color_enabled=False, dependencies=None, key=None, output_file=None):
+    """Write the output of a command to standard output or a file.
+
+    :param chunks: The output, in chunks.
+    :type chunks: collections.Iterable[str]
+
+    :param cache: The render cache in which the output is stored.
+    :type cache: scripttease.cache.RenderCache
+
+    :param color_enabled: Indicates the output should be colorized. Output written to a file is never colorized.
+    :type color_enabled: bool
+
+    :param dependencies: The paths of files on which the output depends.
+    :type dependencies: list[str]
+
+    :param key: The key of the output in the render cache. Output is not cached when this is ``None``.
+    :type key: str
+
+    :param output_file: The path to which the output is written.
+    :type output_file: str
+
+    :rtype: int
+    :returns: An exit code.
+
+    """
+    if key is not None:
+        output = list()
+        chunks = _tee(chunks, output)
+    else:
+        output = None
+
+    if output_file is not None:
+        if not write_file(output_file, chunks):
+            return EXIT.ERROR
+    elif color_enabled:
+        # Pygments is imported only when it is needed. Highlighting requires all of the output.
+        from commonkit import highlight_code
+        print(highlight_code("".join(chunks), language="bash"))
     else:
-        print(script)
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+
+        sys.stdout.write("\n")
+
+    if output is not None:
+        cache.set(key, "".join(output), dependencies=dependencies)
 
     return EXIT.OK
+
+
+def _tee(chunks, output):
+    """Collect chunks of output as they are written.
+
+    :param chunks: The output, in chunks.
+    :type chunks: collections.Iterable[str]
+
+    :param output: The list to which each chunk is added.
+    :type output: list
+
+    :rtype: collections.Iterable[str]
+
+    """
+    for chunk in chunks:
+        output.append(chunk)
+        yield chunk
@@ -0,0 +1,195 @@
+# Imports
+
+from argparse import ArgumentParser
+import json
+import os
+import socket
+import sys
+
+# Exports
+
+__all__ = (
+    "render",
+)
+
+# Functions
+
+
+def render(socket_path, path, context=None, filters=None, locations=None, mode="commands", options=None,
+           overlay="ubuntu", timeout=None, variables=None, variables_file=None):
+    """Render a configuration file using a server.
+
+    :param socket_path: The path to the socket of the server.
+    :type socket_path: str
+
+    :param path: The path to the configuration file.
+    :type path: str
+
+    :param context: The context to be applied to the file and templates.
+    :type context: dict
+
+    :param filters: Filters in the same form as ``tease -f``.
+    :type filters: list[str]
+
+    :param locations: The locations of template files.
+    :type locations: list[str]
+
+    :param mode: The kind of output: ``commands``, ``docs``, or ``script``.
+    :type mode: str
+
+    :param options: Options to be applied to all commands, as a dictionary or in the same form as ``tease -O``.
+    :type options: dict | list[str]
+
+    :param overlay: The name of the command overlay.
+    :type overlay: str
+
+    :param timeout: The number of seconds to wait for the server.
+    :type timeout: float
+
+    :param variables: Context variables in the same form as ``tease -C``. These take precedence over the context and
+                      the variables file.
+    :type variables: list[str]
+
+    :param variables_file: The path to a file of context variables.
+    :type variables_file: str
+
+    :rtype: dict
+    :returns: The ``exit_code``, the ``output`` (or ``None`` when an error occurred), and a list of ``errors``.
+
+    :raise: OSError, ValueError
+    :raises: ``OSError`` if the server could not be reached, or ``ValueError`` if the response is not valid.
+
+    Paths are sent to the server as absolute paths, so they may be given relative to the current directory.
+
+    """
+    request = {
+        'context': context,
+        'filters': filters,
+        'locations': [os.path.abspath(location) for location in locations or list()],
+        'mode': mode,
+        'options': options,
+        'overlay': overlay,
+        'path': os.path.abspath(path),
+        'variables': variables,
+        'variables_file': os.path.abspath(variables_file) if variables_file else None,
+    }
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+
+    try:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+        with connection.makefile("rb") as f:
+            response = f.readline()
+    finally:
+        connection.close()
+
+    return json.loads(response.decode("utf-8"))
+
+
+def main():
+    """Render a configuration file using a server and print the output."""
+    parser = ArgumentParser(description=main.__doc__)
+
+    parser.add_argument(
+        "path",
+        default="commands.ini",
+        nargs="?",
+        help="The path to the configuration file."
+    )
+
+    parser.add_argument(
+        "-C=",
+        "--context=",
+        action="append",
+        dest="variables",
+        help="Context variables for use in pre-parsing the config and templates. In the form of: name:value"
+    )
+
+    parser.add_argument(
+        "-d",
+        "--docs",
+        action="store_const",
+        const="docs",
+        default="commands",
+        dest="mode",
+        help="Output documentation instead of code."
+    )
+
+    parser.add_argument(
+        "-f=",
+        "--filter=",
+        action="append",
+        dest="filters",
+        help="Filter the commands in the same way as the tease command."
+    )
+
+    parser.add_argument(
+        "-O=",
+        "--option=",
+        action="append",
+        dest="options",
+        help="Common command options in the form of: name:value"
+    )
+
+    parser.add_argument(
+        "-s",
+        "--script",
+        action="store_const",
+        const="script",
+        dest="mode",
+        help="Output commands as a script."
+    )
+
+    parser.add_argument(
+        "--socket=",
+        dest="socket_path",
+        required=True,
+        help="The path to the socket of the server."
+    )
+
+    parser.add_argument(
+        "-T=",
+        "--template-path=",
+        action="append",
+        dest="template_locations",
+        help="The location of template files that may be used with the template command."
+    )
+
+    parser.add_argument(
+        "-V=",
+        "--variables-file=",
+        dest="variables_file",
+        help="Load variables from a file."
+    )
+
+    args = parser.parse_args()
+
+    try:
+        response = render(
+            args.socket_path,
+            args.path,
+            filters=args.filters,
+            locations=args.template_locations,
+            mode=args.mode,
+            options=args.options,
+            variables=args.variables,
+            variables_file=args.variables_file
+        )
+    except (OSError, ValueError) as e:
+        sys.stderr.write("Could not render %s using %s: %s\n" % (args.path, args.socket_path, e))
+        exit(1)
+
+    for error in response.get("errors", list()):
+        sys.stderr.write("%s\n" % error)
+
+    if response.get("output") is not None:
+        print(response["output"])
+
+    exit(response.get("exit_code", 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 # Imports
 
 import logging
-from importlib import import_module
+import os
 from .constants import LOGGER_NAME
 from .library.commands import ItemizedCommand
+from .library.overlays import get_overlay
 
 log = logging.getLogger(LOGGER_NAME)
 
@@ -54,31 +55,158 @@ class Factory(object):
             log.warning("Command does not exist in %s overlay: %s" % (self._overlay, name))
             return None
 
-        callback = self.overlay.MAPPINGS[name]
+        command, errors = self._create(name, self.overlay.MAPPINGS[name], self.overlay.get_signature(name), args,
+                                       kwargs)
+        for error in errors:
+            log.critical("Failed to load %s command: %s" % (name, error))
 
-        try:
-            items = kwargs.pop("items", None)
-            if items is not None:
-                return ItemizedCommand(callback, items, *args, name=name, **kwargs)
+        return command
 
-            command = callback(*args, **kwargs)
-            command.name = name
-            return command
-        except (KeyError, NameError, TypeError, ValueError) as e:
-            log.critical("Failed to load %s command: %s" % (name, e))
-            return None
+    def get_commands(self, specs, options=None):
+        """Get many commands at once.
+
+        :param specs: The command specifications, each given as ``(name, args, kwargs)``.
+        :type specs: collections.Iterable[tuple]
+
+        :param options: Options applied to every command. Keyword arguments of the specification take precedence.
+        :type options: dict
+
+        :rtype: tuple[list, list]
+        :returns: The commands that were created and a list of ``(spec, errors)`` for those that could not be created.
+
+        :raise: RuntimeError
+        :raises: ``RuntimeError`` if the factory has not yet been loaded.
+
+        """
+        commands = list()
+        failures = list()
+        for spec, command, errors in self.iter_commands(specs, options=options):
+            if command is None:
+                failures.append((spec, errors))
+            else:
+                commands.append(command)
+
+        return commands, failures
+
+    def get_errors(self, name, *args, **kwargs):
+        """Check the arguments for a command without creating the command.
+
+        :param name: The name of the command.
+        :type name: str
+
+        args and kwargs are those that would be used to initialize the command.
+
+        :rtype: list[str]
+        :returns: A list of problems with the command or its arguments. The list is empty when the command may be
+                  created.
+
+        :raise: RuntimeError
+        :raises: ``RuntimeError`` if the factory has not yet been loaded.
+
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Factory has not been loaded, so no commands are available. Call load() method first!")
+
+        signature = self.overlay.get_signature(name)
+        if signature is None:
+            return ["command does not exist in %s overlay: %s" % (self._overlay, name)]
+
+        kwargs.pop("items", None)
+        kwargs.pop("items_from", None)
+
+        return signature.check(args, kwargs)
+
+    def iter_commands(self, specs, options=None):
+        """Create commands as the specifications are consumed. See ``get_commands()``.
+
+        :rtype: collections.Iterable[tuple]
+        :returns: ``(spec, command, errors)`` for each specification. The command is ``None`` when errors occurred.
+
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Factory has not been loaded, so no commands are available. Call load() method first!")
+
+        # The callback and signature are resolved only once for each distinct command name.
+        callbacks = dict()
+
+        for spec in specs:
+            name, args, kwargs = spec
+
+            if name not in callbacks:
+                callbacks[name] = (self.overlay.MAPPINGS.get(name), self.overlay.get_signature(name))
+
+            callback, signature = callbacks[name]
+            if callback is None:
+                yield spec, None, ["command does not exist in %s overlay: %s" % (self._overlay, name)]
+                continue
+
+            # Options are combined with the command's own kwargs only when there are options to apply.
+            if options:
+                _kwargs = options.copy()
+                _kwargs.update(kwargs)
+            else:
+                _kwargs = kwargs
+
+            command, errors = self._create(name, callback, signature, args, _kwargs)
+
+            yield spec, command, errors
 
     def load(self):
         """Load the factory.
 
         :rtype: bool
 
+        .. note::
+            Overlays are shared by all factories in the process, and the modules of an overlay are imported only when a
+            command is first requested.
+
         """
         try:
-            self.overlay = import_module("scripttease.library.overlays.%s" % self._overlay)
+            self.overlay = get_overlay(self._overlay)
             self.is_loaded = True
         except ImportError as e:
             log.error("The %s overlay could not be imported: %s" % (self._overlay, str(e)))
             pass
 
         return self.is_loaded
+
+    # noinspection PyMethodMayBeStatic
+    def _create(self, name, callback, signature, args, kwargs):
+        """Create a command from a callback.
+
+        :rtype: tuple
+        :returns: The command (or ``None``) and a list of errors.
+
+        """
+        if "items" in kwargs or "items_from" in kwargs:
+            kwargs = kwargs.copy()
+            items = kwargs.pop("items", None)
+            items_from = kwargs.pop("items_from", None)
+
+            if items_from is not None and not os.path.exists(items_from):
+                return None, ["items file does not exist: %s" % items_from]
+        else:
+            items = None
+            items_from = None
+
+        # Arguments are checked against the signature before the callback is invoked. All of the problems are reported
+        # at once.
+        errors = signature.check(args, kwargs)
+        if errors:
+            return None, errors
+
+        # The callback may still reject argument values.
+        try:
+            if items is not None or items_from is not None:
+                command = ItemizedCommand(callback, items, *args, items_from=items_from, name=name, **kwargs)
+                return command, list()
+
+            command = callback(*args, **kwargs)
+
+            # Functions (and commands given an explicit name) keep their own name.
+            if command.name is None:
+                command.name = name
+
+            return command, list()
+        except (KeyError, NameError, TypeError, ValueError) as e:
+            return None, [str(e)]
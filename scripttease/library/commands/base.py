@@ -1,9 +1,40 @@
+# Imports
+
+import inspect
+import re
+
+# Constants
+
+ITEM_SENTINELS = ("SCRIPTTEASEITEMA", "SCRIPTTEASEITEMB")
+"""Stand-ins for ``$item`` used to determine whether an itemized statement may be rendered as a loop."""
+
+SAFE_ITEM = re.compile(r"^[\w@%+=:,./-]+$")
+"""Items that may be listed in a bash loop without quoting."""
+
 # Classes
 
 
 class Command(object):
     """A command line statement."""
 
+    __slots__ = (
+        "cd",
+        "comment",
+        "condition",
+        "environments",
+        "function",
+        "name",
+        "prefix",
+        "register",
+        "shell",
+        "statement",
+        "stop",
+        "sudo",
+        "tags",
+        "_attributes",
+        "_statements",
+    )
+
     def __init__(self, statement, comment=None, condition=None, cd=None, environments=None, function=None, name=None,
                  prefix=None, register=None, shell=None, stop=False, sudo=None, tags=None, **kwargs):
         """Initialize a command.
@@ -68,15 +99,26 @@ class Command(object):
         if isinstance(sudo, Sudo):
             self.sudo = sudo
         elif type(sudo) is str:
-            self.sudo = Sudo(enabled=True, user=sudo)
+            self.sudo = Sudo.get(user=sudo)
         elif sudo is True:
-            self.sudo = Sudo(enabled=True)
+            self.sudo = Sudo.get()
         else:
-            self.sudo = Sudo()
+            self.sudo = SUDO_DISABLED
+
+        # Most commands have no dynamic attributes, so the dictionary is only kept when there is something to keep.
+        self._attributes = kwargs or None
 
-        self._attributes = kwargs
+        # Rendered statements are cached by get_statement().
+        self._statements = None
 
     def __getattr__(self, item):
+        # Special names and slots that have not (yet) been assigned are not dynamic attributes.
+        if item.startswith("__") or item in ("_attributes", "_statements"):
+            raise AttributeError(item)
+
+        if self._attributes is None:
+            return None
+
         return self._attributes.get(item)
 
     def __repr__(self):
@@ -85,6 +127,13 @@ class Command(object):
 
         return "<%s>" % self.__class__.__name__
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        # Any change to the command may change the statement.
+        if name != "_statements":
+            super().__setattr__("_statements", None)
+
     def get_statement(self, cd=False, suppress_comment=False):
         """Get the full statement.
 
@@ -96,6 +145,62 @@ class Command(object):
 
         :rtype: str
 
+        .. note::
+            The statement is cached until an attribute of the command is changed.
+
+        """
+        key = (bool(cd), bool(suppress_comment))
+        if self._statements is not None and key in self._statements:
+            return self._statements[key]
+
+        statement = self._build_statement(cd=cd, suppress_comment=suppress_comment)
+
+        if self._statements is None:
+            self._statements = dict()
+
+        self._statements[key] = statement
+
+        return statement
+
+    def has_attribute(self, name):
+        """Indicates whether the command has the named, dynamic attribute.
+
+        :param name: The name of the attribute to be checked.
+        :type name: str
+
+        :rtype: bool
+
+        """
+        if self._attributes is None:
+            return False
+
+        return name in self._attributes
+
+    @property
+    def is_itemized(self):
+        """Always returns ``False``."""
+        return False
+
+    def set_attribute(self, name, value):
+        """Set the value of a dynamic attribute.
+
+        :param name: The name of the attribute.
+        :type name: str
+
+        :param value: The value of the attribute.
+
+        """
+        if self._attributes is None:
+            self._attributes = dict()
+
+        self._attributes[name] = value
+        self._statements = None
+
+    def _build_statement(self, cd=False, suppress_comment=False):
+        """Build the full statement. See ``get_statement()``.
+
+        :rtype: str
+
         """
         a = list()
 
@@ -136,33 +241,6 @@ class Command(object):
 
         return "\n".join(b)
 
-    def has_attribute(self, name):
-        """Indicates whether the command has the named, dynamic attribute.
-
-        :param name: The name of the attribute to be checked.
-        :type name: str
-
-        :rtype: bool
-
-        """
-        return name in self._attributes
-
-    @property
-    def is_itemized(self):
-        """Always returns ``False``."""
-        return False
-
-    def set_attribute(self, name, value):
-        """Set the value of a dynamic attribute.
-
-        :param name: The name of the attribute.
-        :type name: str
-
-        :param value: The value of the attribute.
-
-        """
-        self._attributes[name] = value
-
     def _get_statement(self):
         """By default, get the statement passed upon command initialization.
 
@@ -175,7 +253,18 @@ class Command(object):
 class ItemizedCommand(object):
     """An itemized command represents multiple commands of with the same statement but different parameters."""
 
-    def __init__(self, callback, items, *args, name=None, **kwargs):
+    __slots__ = (
+        "args",
+        "callback",
+        "items",
+        "items_from",
+        "kwargs",
+        "loop",
+        "name",
+        "_command_class",
+    )
+
+    def __init__(self, callback, items, *args, items_from=None, loop=False, name=None, **kwargs):
         """Initialize the command.
 
         :param callback: The function to be used to generate the command.
@@ -183,6 +272,13 @@ class ItemizedCommand(object):
         :param items: The command arguments.
         :type items: list[str]
 
+        :param items_from: The path to a file from which additional items are read, one per line. Blank lines and lines
+                           beginning with ``#`` are ignored. The file is read each time the items are needed.
+        :type items_from: str
+
+        :param loop: Render the statement as a bash ``for`` loop when the statement differs only by ``$item``.
+        :type loop: bool
+
         :param name: The name of the command from the mapping. Not used and not required for programmatic use, but
                      automatically assigned during factory instantiation.
         :type name: str
@@ -195,8 +291,11 @@ class ItemizedCommand(object):
         self.args = args
         self.callback = callback
         self.items = items
+        self.items_from = items_from
         self.kwargs = kwargs
+        self.loop = loop
         self.name = name
+        self._command_class = None
 
         # Set defaults for when ItemizedCommand is referenced directly before individual commands are instantiated. For
         # example, when command filtering occurs.
@@ -204,52 +303,87 @@ class ItemizedCommand(object):
         self.kwargs.setdefault("tags", list())
 
     def __getattr__(self, item):
+        if item.startswith("__") or item in ("kwargs", "_command_class"):
+            raise AttributeError(item)
+
         return self.kwargs.get(item)
 
     def __repr__(self):
         return "<%s %s>" % (self.__class__.__name__, self.callback.__name__)
 
+    def get_command_class(self):
+        """Get the class of the commands created by the callback. The class is determined only once.
+
+        :rtype: type | None
+        :returns: The class or ``None`` if there are no items from which to create a command.
+
+        """
+        if self._command_class is not None:
+            return self._command_class
+
+        if inspect.isclass(self.callback):
+            self._command_class = self.callback
+        else:
+            for command in self.iter_commands():
+                self._command_class = command.__class__
+                break
+
+        return self._command_class
+
     def get_commands(self):
         """Get the commands to be executed.
 
         :rtype: list[BaseType(Command)]
 
         """
-        kwargs = self.kwargs.copy()
+        return list(self.iter_commands())
 
-        a = list()
-        for item in self.items:
+    def iter_commands(self):
+        """Create the commands to be executed one item at a time.
+
+        :rtype: collections.Iterable[BaseType(Command)]
+
+        """
+        for item in self.iter_items():
             args = list()
             for arg in self.args:
                 args.append(arg.replace("$item", item))
 
-            command = self.callback(*args, **kwargs)
-            a.append(command)
+            yield self.callback(*args, **self.kwargs.copy())
+
+    def iter_items(self):
+        """Get the items, including those read from ``items_from``.
 
-        return a
+        :rtype: collections.Iterable[str]
+
+        """
+        if self.items is not None:
+            yield from self.items
+
+        if self.items_from is not None:
+            with open(self.items_from, "r", encoding="utf-8") as f:
+                for line in f:
+                    item = line.strip()
+                    if item and not item.startswith("#"):
+                        yield item
 
     def get_statement(self, cd=False, suppress_comment=False):
-        """Override to get multiple commands."""
-        kwargs = self.kwargs.copy()
-        comment = kwargs.pop("comment", "execute multiple commands")
+        """Override to get multiple commands.
 
-        a = list()
-        # a.append("# %s" % comment)
+        When ``loop`` is enabled, a single ``for`` loop is returned if possible. Otherwise, the statement of each
+        command is included.
+
+        """
+        if self.loop:
+            statement = self._get_loop_statement(cd=cd, suppress_comment=suppress_comment)
+            if statement is not None:
+                return statement
 
-        commands = self.get_commands()
-        for c in commands:
+        a = list()
+        for c in self.iter_commands():
             a.append(c.get_statement(cd=cd, suppress_comment=suppress_comment))
             a.append("")
 
-        # for item in self.items:
-        #     args = list()
-        #     for arg in self.args:
-        #         args.append(arg.replace("$item", item))
-        #
-        #     command = self.command_class(*args, **kwargs)
-        #     a.append(command.preview(cwd=cwd))
-        #     a.append("")
-
         return "\n".join(a)
 
     def has_attribute(self, name):
@@ -282,9 +416,82 @@ class ItemizedCommand(object):
         """
         self.kwargs[name] = value
 
+    def _get_loop_statement(self, cd=False, suppress_comment=False):
+        """Get the statement as a bash loop.
+
+        :rtype: str | None
+        :returns: The loop or ``None`` if the statement cannot be expressed as a loop over the items.
+
+        """
+        items = list(self.iter_items())
+        if not items:
+            return None
+
+        for item in items:
+            if not SAFE_ITEM.match(item):
+                return None
+
+        # The command is created twice with different stand-ins for the item. If the statements differ only by the
+        # stand-in, the statement may be rendered once with a reference to the loop variable.
+        commands = list()
+        statements = list()
+        for sentinel in ITEM_SENTINELS:
+            args = [arg.replace("$item", sentinel) for arg in self.args]
+            command = self.callback(*args, **self.kwargs.copy())
+            commands.append(command)
+
+            statement = command.get_statement(cd=cd, suppress_comment=True)
+            if statement is None or sentinel not in statement:
+                return None
+
+            # The item must not be used to form variable names or appear where the shell will not expand it.
+            if "'" in statement or "<<" in statement:
+                return None
+
+            if re.search(r"\$\{?%s|%s\w*=" % (sentinel, sentinel), statement):
+                return None
+
+            statements.append(statement.replace(sentinel, "${item}"))
+
+        if statements[0] != statements[1]:
+            return None
+
+        # A callback may also transform the item (for example, to get the base name of a path) in a way that the
+        # stand-ins cannot reveal. The loop is used only when it runs exactly the statements that would be unrolled.
+        for item, command in zip(items, self.iter_commands()):
+            if statements[1].replace("${item}", item) != command.get_statement(cd=cd, suppress_comment=True):
+                return None
+
+        a = list()
+
+        comment = commands[1].comment
+        if comment is not None and not suppress_comment:
+            a.append("# %s" % comment.replace(ITEM_SENTINELS[1], "$item"))
+
+        a.append("for item in %s; do" % " ".join(items))
+        for line in statements[1].split("\n"):
+            a.append("    %s" % line)
+
+        a.append("done;")
+
+        return "\n".join(a)
+
 
 class Sudo(object):
-    """Helper class for defining sudo options."""
+    """Helper class for defining sudo options.
+
+    .. note::
+        Instances obtained from ``Sudo.get()`` (which is how commands create them) are shared, so instances may not be
+        modified. Assign a new instance to the command instead.
+
+    """
+
+    __slots__ = (
+        "enabled",
+        "user",
+    )
+
+    _shared = dict()
 
     def __init__(self, enabled=False, user="root"):
         """Initialize the helper.
@@ -296,14 +503,55 @@ class Sudo(object):
         :type user: str
 
         """
-        self.enabled = enabled
-        self.user = user
+        object.__setattr__(self, "enabled", enabled)
+        object.__setattr__(self, "user", user)
 
     def __bool__(self):
         return self.enabled
 
+    def __delattr__(self, name):
+        raise AttributeError("%s instances may not be modified." % self.__class__.__name__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sudo):
+            return NotImplemented
+
+        return (self.enabled, self.user) == (other.enabled, other.user)
+
+    def __hash__(self):
+        return hash((self.enabled, self.user))
+
+    def __reduce__(self):
+        # Instances are created again when unpickled (for example, by a process pool) rather than being modified.
+        return self.__class__, (self.enabled, self.user)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s instances may not be modified." % self.__class__.__name__)
+
     def __str__(self):
         if self.enabled:
             return "sudo -u %s" % self.user
 
         return ""
+
+    @classmethod
+    def get(cls, enabled=True, user="root"):
+        """Get a shared instance.
+
+        :param enabled: Indicates sudo is enabled.
+        :type enabled: bool
+
+        :param user: The user to be invoked.
+        :type user: str
+
+        :rtype: Sudo
+
+        """
+        key = (enabled, user)
+        if key not in cls._shared:
+            cls._shared[key] = cls(enabled=enabled, user=user)
+
+        return cls._shared[key]
+
+
+SUDO_DISABLED = Sudo.get(enabled=False)
@@ -1,9 +1,13 @@
 # Imports
 
-from commonkit import parse_jinja_template, read_file
+from collections import ChainMap
+from commonkit import read_file
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jinja2.exceptions import TemplateError, TemplateNotFound
 import logging
 import os
+import re
+import time
 from ...constants import LOGGER_NAME
 from .base import Command
 
@@ -12,12 +16,243 @@ log = logging.getLogger(LOGGER_NAME)
 # Exports
 
 __all__ = (
+    "EXECUTOR_PROCESS",
+    "EXECUTOR_THREAD",
+    "get_environment",
+    "get_simple_template",
+    "iter_jinja_template",
+    "parse_jinja_template",
+    "render_templates",
+    "SimpleTemplate",
     "Template",
+    "TemplateIndex",
 )
 
+# Constants
+
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+
+# Caches
+
+_environments = dict()
+_simple_templates = dict()
+
+# Functions
+
+
+def get_environment(locations, cache_path=None):
+    """Get the Jinja environment for a set of locations. The environment is shared by all templates in the process that
+    are found in the same locations, so each template is loaded and compiled only once.
+
+    :param locations: The paths to be searched for templates.
+    :type locations: list[str] | tuple[str]
+
+    :param cache_path: The path to a directory where compiled templates (bytecode) are cached between processes.
+    :type cache_path: str
+
+    :rtype: jinja2.Environment
+
+    """
+    key = (tuple(locations), cache_path)
+    if key in _environments:
+        return _environments[key]
+
+    bytecode_cache = None
+    if cache_path is not None:
+        os.makedirs(cache_path, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_path)
+
+    env = Environment(bytecode_cache=bytecode_cache, loader=FileSystemLoader(list(locations)))
+    _environments[key] = env
+
+    return env
+
+
+def get_simple_template(path):
+    """Get a compiled "simple" template. The template is compiled once and compiled again only when the file changes.
+
+    :param path: The path to the template.
+    :type path: str
+
+    :rtype: SimpleTemplate
+
+    """
+    mtime = os.stat(path).st_mtime_ns
+
+    if path in _simple_templates:
+        _mtime, template = _simple_templates[path]
+        if _mtime == mtime:
+            return template
+
+    template = SimpleTemplate(read_file(path))
+    _simple_templates[path] = (mtime, template)
+
+    return template
+
+
+def iter_jinja_template(path, context, cache_path=None):
+    """Render a Jinja template a piece at a time, so that the whole of the output need not be held in memory.
+
+    :param path: The path to the template file.
+    :type path: str
+
+    :param context: The context to be used when rendering the template.
+    :type context: dict
+
+    :param cache_path: The path to a directory where compiled templates are cached.
+    :type cache_path: str
+
+    :rtype: collections.Iterable[str]
+
+    """
+    env = get_environment([os.path.dirname(path)], cache_path=cache_path)
+    template = env.get_template(os.path.basename(path))
+
+    return template.generate(**context)
+
+
+def parse_jinja_template(path, context, cache_path=None):
+    """Parse a Jinja 2 template using a shared environment.
+
+    :param path: Path to the template.
+    :type path: str
+
+    :param context: The context to be parsed into the template.
+    :type context: dict
+
+    :param cache_path: The path to a directory where compiled templates are cached.
+    :type cache_path: str
+
+    :rtype: str
+
+    """
+    env = get_environment([os.path.dirname(path)], cache_path=cache_path)
+    template = env.get_template(os.path.basename(path))
+
+    return template.render(**context)
+
+
+def render_templates(templates, executor=EXECUTOR_THREAD, workers=None):
+    """Render templates concurrently. The content of each template is kept by the template so that it is not rendered
+    again when the statement is output.
+
+    :param templates: The templates to be rendered.
+    :type templates: list[Template]
+
+    :param executor: Render using a pool of threads (``thread``) or processes (``process``).
+    :type executor: str
+
+    :param workers: The maximum number of threads or processes. Defaults to that of the executor.
+    :type workers: int
+
+    :rtype: list[tuple[Template, str]]
+    :returns: The template and error message of each template that could not be rendered.
+
+    """
+    # The pools are imported only when they are used, as importing them (especially the process pool) is slow.
+    if executor == EXECUTOR_PROCESS:
+        from concurrent.futures import ProcessPoolExecutor as pool_class
+    elif executor == EXECUTOR_THREAD:
+        from concurrent.futures import ThreadPoolExecutor as pool_class
+    else:
+        raise ValueError("Unsupported executor: %s" % executor)
+
+    templates = list(templates)
+    if not templates:
+        return list()
+
+    errors = list()
+    with pool_class(max_workers=workers) as pool:
+        # Results are returned in the same order as the templates.
+        for template, result in zip(templates, pool.map(_render_template, templates)):
+            content, error, template.missing_keys, template.unused_keys = result
+            if error is not None:
+                errors.append((template, error))
+            else:
+                template.content = content
+
+    return errors
+
+
+def _render_template(template):
+    """Render a template in a worker. See ``render_templates()``.
+
+    :rtype: tuple[str | None, str | None, set, set]
+    :returns: The content, error message, missing keys, and unused keys. A process pool renders a copy of the template,
+              so the keys recorded by the copy are returned along with the content.
+
+    """
+    content, error = template.render()
+
+    return content, error, template.missing_keys, template.unused_keys
+
 # Classes
 
 
+class SimpleTemplate(object):
+    """A compiled "simple" template, where ``$name$`` is replaced with the value of ``name`` from the context."""
+
+    PATTERN = re.compile(r"\$([\w.-]+)(?=\$)")
+
+    def __init__(self, content):
+        """Initialize the template.
+
+        :param content: The content of the template.
+        :type content: str
+
+        The content is searched once for the positions of possible placeholders, so that rendering requires a single
+        pass regardless of the size of the context. The closing ``$`` of a placeholder is not consumed by the search,
+        because text such as ``$NAME-$version$`` is a placeholder only when ``version`` (and not ``NAME-``) is in the
+        context.
+
+        """
+        self.content = content
+        self.positions = [(m.start(), m.end(), m.group(1)) for m in self.PATTERN.finditer(content)]
+        self.placeholders = frozenset([name for start, end, name in self.positions])
+
+    def __repr__(self):
+        return "<%s (%s)>" % (self.__class__.__name__, len(self.placeholders))
+
+    def render(self, context):
+        """Render the template. Only names that are in the context are replaced.
+
+        :param context: The values of the placeholders.
+        :type context: dict
+
+        :rtype: tuple[str, set, set]
+        :returns: The content, the names of placeholders that are not in the context (these are left as is), and the
+                  names in the context that are not used by the template.
+
+        """
+        a = list()
+        misses = list()
+        position = 0
+        replaced = set()
+
+        for start, end, name in self.positions:
+            # The opening $ has already been used as the closing $ of the previous placeholder.
+            if start < position:
+                continue
+
+            if name in context:
+                a.append(self.content[position:start])
+                a.append(str(context[name]))
+                position = end + 1
+                replaced.add(start)
+            else:
+                misses.append((end, name))
+
+        a.append(self.content[position:])
+
+        # A name is not missing when its closing $ is the opening $ of a placeholder that was replaced.
+        missing = set([name for end, name in misses if end not in replaced])
+
+        unused = set(context).difference(self.placeholders)
+
+        return "".join(a), missing, unused
+
+
 class Template(Command):
     """Parse a template."""
 
@@ -44,6 +279,9 @@ class Template(Command):
                          script templates.
         :type pythonic: bool
 
+        Other kwargs are specific to the template and are used as its context, along with the ``context`` (if any)
+        given in kwargs. The given context is shared with other templates, so it is not copied or changed.
+
         """
         # Base parameters need to be captured, because all others are assumed to be switches for the management command.
         self._kwargs = {
@@ -61,17 +299,21 @@ class Template(Command):
         }
 
         self.backup_enabled = backup
-        self.context = kwargs.pop("context", dict())
+        self.cache_path = kwargs.pop("cache_path", None)
+        self.content = None
+        context = kwargs.pop("context", None)
         self.parser = parser or self.PARSER_JINJA
         self.pythonic = pythonic
         self.line_by_line = lines
         self.locations = kwargs.pop("locations", list())
+        self.missing_keys = set()
         self.source = os.path.expanduser(source)
         self.target = target
+        self.unused_keys = set()
 
-        # Remaining kwargs are added to the context.
-        # print(_kwargs['comment'], kwargs)
-        self.context.update(kwargs)
+        # Remaining kwargs are specific to this template and are layered over the given context, which is shared rather
+        # than copied.
+        self.context = ChainMap(kwargs) if context is None else ChainMap(kwargs, context)
 
         super().__init__("# template: %s" % source, **self._kwargs)
 
@@ -80,25 +322,17 @@ class Template(Command):
 
         :rtype: str | None
 
-        """
-        template = self.get_template()
+        If the template has already been rendered (see ``render_templates()``), the rendered content is returned.
 
-        if self.parser == self.PARSER_SIMPLE:
-            content = read_file(template)
-            for key, value in self.context.items():
-                replace = "$%s$" % key
-                content = content.replace(replace, str(value))
+        """
+        if self.content is not None:
+            return self.content
 
-            return content
+        content, error = self.render()
+        if error is not None:
+            log.error(error)
 
-        try:
-            return parse_jinja_template(template, self.context)
-        except TemplateNotFound:
-            log.error("Template not found: %s" % template)
-            return None
-        except TemplateError as e:
-            log.error("Could not parse %s template: %s" % (template, e))
-            return None
+        return content
 
     def get_statement(self, cd=False, suppress_comment=False):
         """Override to get the statement based on the parser."""
@@ -116,13 +350,38 @@ class Template(Command):
         :rtype: str
 
         """
-        source = self.source
-        for location in self.locations:
-            _source = os.path.join(location, self.source)
-            if os.path.exists(_source):
-                return _source
+        return TEMPLATE_INDEX.find(self.source, self.locations) or self.source
+
+    def render(self):
+        """Render the template.
+
+        :rtype: tuple[str | None, str | None]
+        :returns: The content and an error message. The content is ``None`` when an error occurs.
+
+        When using the simple parser, placeholders without a value in the context are recorded in ``missing_keys`` and
+        context values that are not used by the template are recorded in ``unused_keys``.
+
+        """
+        template = self.get_template()
+
+        if self.parser == self.PARSER_SIMPLE:
+            try:
+                simple_template = get_simple_template(template)
+            except OSError:
+                return None, "Template not found: %s" % template
 
-        return source
+            content, self.missing_keys, self.unused_keys = simple_template.render(self.context)
+            if self.missing_keys:
+                log.debug("Missing values for %s template: %s" % (template, ", ".join(sorted(self.missing_keys))))
+
+            return content, None
+
+        try:
+            return parse_jinja_template(template, self.context, cache_path=self.cache_path), None
+        except TemplateNotFound:
+            return None, "Template not found: %s" % template
+        except TemplateError as e:
+            return None, "Could not parse %s template: %s" % (template, e)
 
     def _get_command(self, content):
         """Get the cat command."""
@@ -195,3 +454,78 @@ class Template(Command):
         content = self.get_content()
 
         return self._get_command(content)
+
+
+class TemplateIndex(object):
+    """An index of the files found in template locations, so that finding a template does not require checking the
+    file system for every location."""
+
+    def __init__(self, interval=1.0):
+        """Initialize the index.
+
+        :param interval: The number of seconds after which a directory is checked for changes.
+        :type interval: float
+
+        """
+        self.interval = interval
+        self._directories = dict()
+
+    def __repr__(self):
+        return "<%s (%s)>" % (self.__class__.__name__, len(self._directories))
+
+    def find(self, source, locations):
+        """Find a template.
+
+        :param source: The path to the template, relative to the locations.
+        :type source: str
+
+        :param locations: The locations to search, in order.
+        :type locations: list[str]
+
+        :rtype: str | None
+        :returns: The path to the template in the first location where it exists.
+
+        """
+        directory, name = os.path.split(source)
+        for location in locations:
+            if name in self.get_names(os.path.join(location, directory)):
+                return os.path.join(location, source)
+
+        return None
+
+    def get_names(self, path):
+        """Get the names of the files and directories in a directory. Each directory is scanned once and scanned again
+        only when its modification time has changed.
+
+        :param path: The path to the directory.
+        :type path: str
+
+        :rtype: frozenset
+
+        """
+        now = time.monotonic()
+
+        if path in self._directories:
+            mtime, checked, names = self._directories[path]
+            if now - checked < self.interval:
+                return names
+        else:
+            mtime = names = None
+
+        try:
+            _mtime = os.stat(path or ".").st_mtime_ns
+        except OSError:
+            _mtime = None
+
+        if names is None or _mtime != mtime:
+            try:
+                names = frozenset(os.listdir(path or "."))
+            except OSError:
+                names = frozenset()
+
+        self._directories[path] = (_mtime, now, names)
+
+        return names
+
+
+TEMPLATE_INDEX = TemplateIndex()
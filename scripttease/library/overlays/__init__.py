@@ -0,0 +1,332 @@
+# Imports
+
+from collections.abc import Mapping
+from importlib import import_module
+from importlib.util import find_spec
+import inspect
+import logging
+import time
+from ...constants import LOGGER_NAME
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "OVERLAYS",
+    "get_load_times",
+    "get_overlay",
+    "LazyMappings",
+    "Overlay",
+    "Signature",
+)
+
+# Constants
+
+OVERLAYS = {
+    'centos': (
+        ("centos", "MAPPINGS"),
+        ("common", "COMMON_MAPPINGS"),
+        ("django", "DJANGO_MAPPINGS"),
+        ("mysql", "MYSQL_MAPPINGS"),
+        ("pgsql", "PGSQL_MAPPINGS"),
+        ("posix", "POSIX_MAPPINGS"),
+    ),
+    'ubuntu': (
+        ("ubuntu", "MAPPINGS"),
+        ("common", "COMMON_MAPPINGS"),
+        ("django", "DJANGO_MAPPINGS"),
+        ("mysql", "MYSQL_MAPPINGS"),
+        ("pgsql", "PGSQL_MAPPINGS"),
+        ("posix", "POSIX_MAPPINGS"),
+    ),
+}
+"""The modules (and the mapping found in each module) that make up an overlay. Modules are listed in the order in
+which the mappings are applied, so a command found in a later module takes precedence. Overlays that are not listed
+here are loaded from a module of the same name with a ``MAPPINGS`` dictionary."""
+
+# Registry
+
+_load_times = dict()
+_overlays = dict()
+
+# Functions
+
+
+def get_load_times():
+    """Get the time spent loading each overlay in this process.
+
+    :rtype: dict
+    :returns: The overlay name and the number of seconds spent importing the overlay's modules.
+
+    """
+    return _load_times.copy()
+
+
+def get_overlay(name):
+    """Get an overlay by name. The overlay is created once per process, and its modules are not imported until a
+    command is first looked up.
+
+    :param name: The name of the overlay.
+    :type name: str
+
+    :rtype: Overlay
+
+    :raise: ImportError
+    :raises: ``ImportError`` if the overlay does not exist.
+
+    """
+    if name in _overlays:
+        return _overlays[name]
+
+    if name in OVERLAYS:
+        layers = OVERLAYS[name]
+    else:
+        # Custom overlays must exist, but are not imported until needed.
+        if find_spec("%s.%s" % (__name__, name)) is None:
+            raise ImportError("No overlay named %s" % name)
+
+        layers = ((name, "MAPPINGS"),)
+
+    overlay = Overlay(name, layers)
+    _overlays[name] = overlay
+
+    return overlay
+
+# Classes
+
+
+class LazyMappings(Mapping):
+    """Command mappings that import the underlying overlay modules only as they are needed."""
+
+    def __init__(self, overlay):
+        """Initialize the mappings.
+
+        :param overlay: The overlay to which the mappings belong.
+        :type overlay: Overlay
+
+        """
+        self.overlay = overlay
+        self._callbacks = dict()
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __getitem__(self, name):
+        callback = self.get(name)
+        if callback is None:
+            raise KeyError(name)
+
+        return callback
+
+    def __iter__(self):
+        return iter(self._get_all())
+
+    def __len__(self):
+        return len(self._get_all())
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.overlay.name)
+
+    def get(self, name, default=None):
+        """Get the callback for the named command.
+
+        :param name: The name of the command.
+        :type name: str
+
+        :param default: The value to return when the command does not exist.
+
+        """
+        if name in self._callbacks:
+            return self._callbacks[name]
+
+        # Modules are searched in reverse so that precedence matches the order in which the mappings are applied.
+        for module, attribute in reversed(self.overlay.layers):
+            mappings = getattr(self.overlay.get_module(module), attribute)
+            if name in mappings:
+                self._callbacks[name] = mappings[name]
+                return mappings[name]
+
+        return default
+
+    def _get_all(self):
+        """Get all of the mappings for the overlay, importing any modules that have not yet been loaded.
+
+        :rtype: dict
+
+        """
+        mappings = dict()
+        for module, attribute in self.overlay.layers:
+            mappings.update(getattr(self.overlay.get_module(module), attribute))
+
+        return mappings
+
+
+class Overlay(object):
+    """A lazily loaded set of command mappings."""
+
+    def __init__(self, name, layers):
+        """Initialize the overlay.
+
+        :param name: The name of the overlay.
+        :type name: str
+
+        :param layers: The module name and mapping attribute for each module that makes up the overlay.
+        :type layers: tuple[tuple[str, str]]
+
+        """
+        self.layers = layers
+        self.MAPPINGS = LazyMappings(self)
+        self.name = name
+        self._modules = dict()
+        self._signatures = dict()
+
+    def __getattr__(self, item):
+        # Other module attributes (such as Function) are also resolved lazily.
+        if item.startswith("_"):
+            raise AttributeError(item)
+
+        for module, attribute in reversed(self.__dict__.get("layers", ())):
+            _module = self.get_module(module)
+            if hasattr(_module, item):
+                return getattr(_module, item)
+
+        raise AttributeError("%s overlay has no attribute: %s" % (self.name, item))
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.name)
+
+    def command_exists(self, name):
+        """Indicates whether a given command exists in this overlay.
+
+        :param name: The name of the command.
+        :type name: str
+
+        :rtype: bool
+
+        """
+        return name in self.MAPPINGS
+
+    def get_signature(self, name):
+        """Get the signature of a command's callback. Signatures are built once and cached on the overlay.
+
+        :param name: The name of the command.
+        :type name: str
+
+        :rtype: Signature | None
+        :returns: The signature or ``None`` if the command does not exist.
+
+        """
+        if name in self._signatures:
+            return self._signatures[name]
+
+        callback = self.MAPPINGS.get(name)
+        if callback is None:
+            return None
+
+        signature = Signature(callback)
+        self._signatures[name] = signature
+
+        return signature
+
+    def get_module(self, name):
+        """Get (importing if necessary) one of the modules that make up the overlay.
+
+        :param name: The module name, relative to ``scripttease.library.overlays``.
+        :type name: str
+
+        :returns: The module.
+
+        """
+        if name in self._modules:
+            return self._modules[name]
+
+        start = time.perf_counter()
+        module = import_module("%s.%s" % (__name__, name))
+        elapsed = time.perf_counter() - start
+
+        _load_times.setdefault(self.name, 0.0)
+        _load_times[self.name] += elapsed
+        log.debug("Loaded %s module for %s overlay in %0.4f seconds." % (name, self.name, elapsed))
+
+        self._modules[name] = module
+
+        return module
+
+    @property
+    def load_time(self):
+        """The number of seconds spent importing this overlay's modules.
+
+        :rtype: float
+
+        """
+        return _load_times.get(self.name, 0.0)
+
+
+class Signature(object):
+    """The call signature of a command callback, used to check arguments before the callback is invoked."""
+
+    def __init__(self, callback):
+        """Initialize the signature.
+
+        :param callback: The function or class used to create the command.
+
+        """
+        self.callback = callback
+        self.keywords = set()
+        self.positional = list()
+        self.required = list()
+        self.var_args = False
+        self.var_kwargs = False
+
+        for parameter in inspect.signature(callback).parameters.values():
+            if parameter.kind == parameter.VAR_POSITIONAL:
+                self.var_args = True
+            elif parameter.kind == parameter.VAR_KEYWORD:
+                self.var_kwargs = True
+            else:
+                if parameter.kind != parameter.KEYWORD_ONLY:
+                    self.positional.append(parameter.name)
+
+                if parameter.kind != parameter.POSITIONAL_ONLY:
+                    self.keywords.add(parameter.name)
+
+                if parameter.default is parameter.empty:
+                    self.required.append(parameter.name)
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.callback.__name__)
+
+    def check(self, args, kwargs):
+        """Check arguments against the signature.
+
+        :param args: The positional arguments to be passed to the callback.
+        :type args: list | tuple
+
+        :param kwargs: The keyword arguments to be passed to the callback.
+        :type kwargs: dict
+
+        :rtype: list[str]
+        :returns: A list of all the problems found. An empty list means the callback may be invoked with the given
+                  arguments.
+
+        """
+        errors = list()
+
+        if not self.var_args and len(args) > len(self.positional):
+            errors.append("takes %s positional arguments but %s were given" % (len(self.positional), len(args)))
+
+        given = set(self.positional[:len(args)])
+        for key in kwargs:
+            if key in given:
+                errors.append("got multiple values for argument: %s" % key)
+            elif key not in self.keywords and not self.var_kwargs:
+                errors.append("got an unexpected keyword argument: %s" % key)
+            else:
+                pass
+
+        for name in self.required:
+            if name not in given and name not in kwargs:
+                errors.append("missing required argument: %s" % name)
+
+        return errors
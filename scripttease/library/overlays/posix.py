@@ -577,26 +577,29 @@ class Function(object):
         self.comment = comment
         self.name = name
 
-    def to_string(self):
-        """Export the function as a string.
+    def iter_chunks(self):
+        """Export the function in chunks, one for each command, rather than as a single string.
 
-        :rtype: str
+        :rtype: collections.Iterable[str]
 
         """
-        a = list()
-
         if self.comment is not None:
-            a.append("# %s" % self.comment)
+            yield "# %s\n" % self.comment
 
-        a.append("function %s()" % self.name)
-        a.append("{")
+        yield "function %s()\n{\n" % self.name
         for command in self.commands:
-            a.append(indent(command.get_statement(cd=True)))
-            a.append("")
+            yield indent(command.get_statement(cd=True))
+            yield "\n\n"
 
-        a.append("}")
+        yield "}"
 
-        return "\n".join(a)
+    def to_string(self):
+        """Export the function as a string.
+
+        :rtype: str
+
+        """
+        return "".join(self.iter_chunks())
 
 
 class Prompt(Command):
@@ -37,6 +37,25 @@ class Script(object):
         """
         self.commands.append(command)
 
+    def iter_chunks(self, shebang="#! /usr/bin/env %(shell)s"):
+        """Export the script in chunks rather than as a single string. Only one statement is held at a time, so very
+        large scripts (for example, with long template content) may be written without building the whole script.
+
+        :param shebang: The shebang to be included. Set to ``None`` to omit the shebang.
+        :type shebang: str
+
+        :rtype: collections.Iterable[str]
+
+        """
+        started = False
+        for part in self._iter_parts(shebang):
+            if started:
+                yield "\n"
+
+            started = True
+            for chunk in part:
+                yield chunk
+
     def to_string(self, shebang="#! /usr/bin/env %(shell)s"):
         """Export the script as a string.
 
@@ -46,24 +65,37 @@ class Script(object):
         :rtype: str
 
         """
-        a = list()
+        return "".join(self.iter_chunks(shebang=shebang))
+
+    def write_to(self, fp, shebang="#! /usr/bin/env %(shell)s"):
+        """Write the script to a file-like object.
+
+        :param fp: The object to which the script is written.
+
+        :param shebang: The shebang to be included. Set to ``None`` to omit the shebang.
+        :type shebang: str
+
+        """
+        for chunk in self.iter_chunks(shebang=shebang):
+            fp.write(chunk)
 
+    def _iter_parts(self, shebang):
+        """Get the parts of the script, each of which is output on its own line.
+
+        :rtype: collections.Iterable[collections.Iterable[str]]
+
+        """
         if shebang is not None:
-            a.append(shebang % {'shell': self.shell})
-            a.append("")
+            yield (shebang % {'shell': self.shell},)
+            yield ("",)
 
         if self.functions is not None:
             for function in self.functions:
-                a.append(function.to_string())
-                a.append("")
+                yield function.iter_chunks()
+                yield ("",)
 
-            # for function in self.functions:
-            #     a.append("%s;" % function.name)
-
-            a.append("")
+            yield ("",)
 
         for command in self.commands:
-            a.append(command.get_statement(cd=True))
-            a.append("")
-
-        return "\n".join(a)
+            yield (command.get_statement(cd=True),)
+            yield ("",)
@@ -1,4 +1,5 @@
 # Imports
 
 from .ini import Config
-from .utils import filter_commands, load_commands, load_config
+from .utils import filter_commands, iter_statements, load_commands, load_config
+from .yaml import YAML
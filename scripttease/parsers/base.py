@@ -1,8 +1,17 @@
 # Imports
 
-from commonkit import File
+from commonkit import any_list_item, smart_cast, split_csv, File
+import logging
+import os
+from types import SimpleNamespace
+from ..constants import LOGGER_NAME
 from ..factory import Factory
+from ..library.commands import ItemizedCommand
+from ..library.commands.templates import render_templates, EXECUTOR_THREAD, Template
 from ..library.scripts import Script
+from .filters import Filter
+
+log = logging.getLogger(LOGGER_NAME)
 
 # Exports
 
@@ -16,17 +25,26 @@ __all__ = (
 class Parser(File):
     """Base class for implementing a command parser."""
 
-    def __init__(self, path, context=None, locations=None, options=None, overlay="ubuntu"):
+    def __init__(self, path, context=None, locations=None, options=None, overlay="ubuntu", cache_path=None,
+                 filters=None):
         super().__init__(path)
 
+        self.cache_path = cache_path
         self.context = context
         self.factory = Factory(overlay)
+        self.failed = 0
+        self.filters = filters or dict()
         self.is_loaded = False
         self.locations = locations or list()
         self.options = options or dict()
         self.overlay = overlay
+        self.skipped = 0
+        self._attached = dict()
+        self._command_index = None
         self._commands = list()
         self._functions = list()
+        self._index = dict()
+        self._indexed = 0
 
     def as_script(self):
         """Convert loaded commands to a script.
@@ -40,41 +58,377 @@ class Parser(File):
             functions=self.get_functions()
         )
 
-    def get_commands(self):
-        """Get the commands that have been loaded from the file.
+    def filter_commands(self, filters):
+        """Filter the loaded commands. See ``get_command_index()``.
+
+        :param filters: The environments and tags to be matched, or a compiled filter expression.
+        :type filters: dict | scripttease.parsers.filters.Filter
 
         :rtype: list[BaseType[scripttease.library.commands.base.Command]]
+        :returns: The matching commands in their original order.
 
         """
-        a = list()
-        for c in self._commands:
-            if c.function is not None:
-                continue
+        index = self.get_command_index()
 
-            a.append(c)
+        if isinstance(filters, Filter):
+            return index.select(filters)
 
-        return a
+        return index.filter(environments=filters.get("environments"), tags=filters.get("tags"))
+
+    def get_command_index(self):
+        """Get an index of the loaded commands by environment and tag. The index is built once and kept, so that the
+        commands may be filtered many times over. It is built again only when more commands have been loaded.
+
+        :rtype: scripttease.parsers.utils.CommandIndex
+
+        """
+        # The utils module imports the parsers, so the index is imported when it is first needed.
+        from .utils import CommandIndex
+
+        # The loaded commands are not copied just to check whether the index is current.
+        commands = self._get_index().get(None, ())
+        if self._command_index is None or len(self._command_index) != len(commands):
+            self._command_index = CommandIndex(commands)
+
+        return self._command_index
+
+    def get_commands(self):
+        """Get the commands that have been loaded from the file.
+
+        :rtype: list[BaseType[scripttease.library.commands.base.Command]]
+
+        """
+        return list(self._get_index().get(None, list()))
 
     def get_functions(self):
         """Get the functions that have been loaded from the file.
 
         :rtype: list[scripttease.library.scripts.Function]
 
+        .. note::
+            Commands are added to each function only once, so this may be called any number of times.
+
         """
+        index = self._get_index()
+
         a = list()
         for f in self._functions:
-            for c in self._commands:
-                if c.function is not None and f.name == c.function:
-                    f.commands.append(c)
+            commands = index.get(f.name, list())
+
+            # Only the commands that have been loaded since the last call are added.
+            count = self._attached.get(f, 0)
+            if count < len(commands):
+                f.commands.extend(commands[count:])
+                self._attached[f] = len(commands)
 
             a.append(f)
 
         return a
 
+    def get_templates(self):
+        """Get the template commands that have been loaded from the file, including those used in functions.
+
+        :rtype: list[scripttease.library.commands.templates.Template]
+
+        """
+        return [c for c in self._commands if isinstance(c, Template)]
+
+    def iter_commands(self):
+        """Load the factory and get the commands of the configuration file as each is created. Sections are read, and
+        commands created, only as they are consumed. Unlike ``load()``, the commands are not kept by the parser.
+
+        :rtype: collections.Iterable[BaseType[scripttease.library.commands.base.Command] |
+                scripttease.library.commands.base.ItemizedCommand]
+
+        .. note::
+            Functions are not included, but are available from ``get_functions()``. Errors are logged, and
+            ``is_loaded`` is ``True`` once the file has been read only if every command was created.
+
+        """
+        raise NotImplementedError()
+
     def load(self):
         """Load the factory and the configuration file.
 
         :rtype: bool
 
         """
-        raise NotImplementedError()
+        for command in self.iter_commands():
+            self._add_command(command)
+
+        return self.is_loaded
+
+    def render_templates(self, executor=EXECUTOR_THREAD, workers=None):
+        """Render all of the loaded templates concurrently. See ``render_templates()`` in
+        ``scripttease.library.commands.templates``.
+
+        :param executor: Render using a pool of threads (``thread``) or processes (``process``).
+        :type executor: str
+
+        :param workers: The maximum number of threads or processes.
+        :type workers: int
+
+        :rtype: bool
+        :returns: ``True`` if all templates were rendered. Errors are logged for each template that was not.
+
+        """
+        errors = render_templates(self.get_templates(), executor=executor, workers=workers)
+        for template, error in errors:
+            log.error(error)
+
+        return len(errors) == 0
+
+    def _add_command(self, command):
+        """Add a loaded command, keeping the index of commands by function name up to date.
+
+        :param command: The command to be added.
+
+        """
+        self._commands.append(command)
+
+        # The index is only updated when it is current. Otherwise, it is rebuilt when next needed.
+        if self._indexed == len(self._commands) - 1:
+            self._index.setdefault(command.function, list()).append(command)
+            self._indexed += 1
+
+    def _get_index(self):
+        """Get the loaded commands grouped by the name of the function to which they belong.
+
+        :rtype: dict
+        :returns: The function name and a list of commands. Commands that do not belong to a function are found under
+                  ``None``.
+
+        """
+        # Commands added directly to the list are also indexed.
+        if self._indexed != len(self._commands):
+            self._index = dict()
+            for command in self._commands:
+                self._index.setdefault(command.function, list()).append(command)
+
+            self._indexed = len(self._commands)
+
+        return self._index
+
+    def _get_key_value(self, key, value):
+        """Process a key/value pair from a section of the file.
+
+        :param key: The key to be processed.
+        :type key: str
+
+        :param value: The value to be processed.
+
+        :rtype: tuple
+        :returns: The key and value, both of which may be modified from the originals.
+
+        """
+        if key in ("environments", "environs", "envs", "env"):
+            _key = "environments"
+            _value = self._get_list(value)
+        elif key in ("func", "function"):
+            _key = "function"
+            _value = value
+        elif key == "items":
+            _key = "items"
+            _value = self._get_list(value)
+        elif key == "items_from":
+            # Item files may be given relative to the configuration file.
+            _key = "items_from"
+            _value = value
+            if not os.path.isabs(value) and os.path.exists(os.path.join(self.directory, value)):
+                _value = os.path.join(self.directory, value)
+        elif key == "tags":
+            _key = "tags"
+            _value = self._get_list(value)
+        else:
+            _key = key
+            _value = smart_cast(value)
+
+        return _key, _value
+
+    # noinspection PyMethodMayBeStatic
+    def _get_list(self, value):
+        """Get a list value, which may be given as a comma separated string.
+
+        :rtype: list
+
+        """
+        if isinstance(value, str):
+            return split_csv(value)
+
+        return list(value)
+
+    def _get_specs(self, sections):
+        """Get command specifications from the sections of the file.
+
+        :param sections: The name and key/value pairs of each section. See ``_iter_sections()``.
+        :type sections: collections.Iterable[tuple]
+
+        :rtype: collections.Iterable[tuple]
+        :returns: The command name, args, and kwargs of each section. Options are *not* included in the kwargs; they
+                  are applied by the factory.
+
+        """
+        for comment, items in sections:
+            args = list()
+            command_name = None
+            count = 0
+            kwargs = {'comment': comment}
+
+            for key, value in items:
+                # The first key/value pair is the command name and arguments.
+                if count == 0:
+                    command_name = key
+
+                    # Formats such as YAML may provide the arguments as a list.
+                    if isinstance(value, (list, tuple)):
+                        args = list(value)
+                    elif value is not None:
+                        value = str(value)
+
+                        # Arguments surrounded by quotes are considered to be one argument. All others are split into
+                        # a list to be passed to the callback. It is also possible that this is a call where no
+                        # arguments are present, so the whole thing is wrapped to protect against an index error.
+                        try:
+                            if value[0] == '"':
+                                args.append(value.replace('"', ""))
+                            else:
+                                args = value.split(" ")
+                        except IndexError:
+                            pass
+                else:
+                    _key, _value = self._get_key_value(key, value)
+
+                    kwargs[_key] = _value
+
+                count += 1
+
+            # Sections excluded by the filters never reach the factory.
+            if self._is_excluded(command_name, kwargs):
+                self.skipped += 1
+                continue
+
+            yield command_name, args, kwargs
+
+    def _is_excluded(self, command_name, kwargs):
+        """Indicates whether a section is excluded by the filters before the command is created. Only environments
+        and tags are checked, because the overlay may change the comment of the command it creates. A compiled filter
+        expression is matched in full once the command has been created. See ``_is_selected()``.
+
+        :param command_name: The name of the command.
+        :type command_name: str
+
+        :param kwargs: The keyword arguments of the section.
+        :type kwargs: dict
+
+        :rtype: bool
+
+        .. note::
+            Functions, and the commands that belong to them, are never excluded.
+
+        """
+        if not self.filters or "function" in kwargs:
+            return False
+
+        if self.factory.is_loaded and self.factory.overlay.MAPPINGS.get(command_name) is self.factory.overlay.Function:
+            return False
+
+        # Options are applied to every command, so these may also provide environments and tags.
+        _environments = self._get_list(kwargs.get("environments", self.options.get("environments", list())))
+        _tags = self._get_list(kwargs.get("tags", self.options.get("tags", list())))
+
+        if isinstance(self.filters, Filter):
+            return not self.filters.may_match(SimpleNamespace(environments=_environments, tags=_tags))
+
+        environments = self.filters.get("environments")
+        if environments is not None:
+            if len(_environments) > 0 and not any_list_item(environments, _environments):
+                return True
+
+        tags = self.filters.get("tags")
+        if tags is not None:
+            if not any_list_item(tags, _tags):
+                return True
+
+        return False
+
+    def _is_selected(self, command):
+        """Indicates whether a command that has been created is matched by a compiled filter expression. Sections that
+        are excluded by their environments and tags never reach this point; see ``_is_excluded()``.
+
+        :param command: The command.
+
+        :rtype: bool
+
+        .. note::
+            Commands that belong to a function are always selected.
+
+        """
+        if not isinstance(self.filters, Filter) or command.function is not None:
+            return True
+
+        return self.filters.match(command)
+
+    def _iter_commands(self, specs):
+        """Create the commands for the given specifications.
+
+        :param specs: The command specifications. See ``_get_specs()``.
+        :type specs: collections.Iterable[tuple]
+
+        :rtype: collections.Iterable[BaseType[scripttease.library.commands.base.Command] |
+                scripttease.library.commands.base.ItemizedCommand]
+
+        Functions are kept by the parser rather than being returned. Each specification from which a command could not
+        be created is counted in ``failed``.
+
+        """
+        for spec, command, errors in self.factory.iter_commands(specs, options=self.options):
+            if command is None:
+                for error in errors:
+                    log.critical("Failed to load %s command: %s" % (spec[0], error))
+
+                self.failed += 1
+                continue
+
+            if isinstance(command, self.factory.overlay.Function):
+                self._functions.append(command)
+                continue
+
+            commands = [command]
+            if isinstance(command, ItemizedCommand):
+                # Itemized templates are expanded so that each may be loaded with additional resources.
+                command_class = command.get_command_class()
+                if command_class is not None and issubclass(command_class, Template):
+                    commands = command.iter_commands()
+
+            for c in commands:
+                if not self._is_selected(c):
+                    self.skipped += 1
+                    continue
+
+                if isinstance(c, Template):
+                    self._load_template(c)
+
+                yield c
+
+        if self.skipped > 0:
+            log.debug("Skipped %s sections of %s that do not match the filters." % (self.skipped, self.path))
+
+    def _load_template(self, command):
+        """Load additional resources for a template command.
+
+        :param command: The template command.
+        :type command: Template
+
+        """
+        command.cache_path = self.cache_path
+
+        # The context of the parser is shared by all templates. Values given to the template take precedence.
+        if self.context is not None:
+            command.context.maps.append(self.context)
+
+        # Custom locations come before default locations.
+        command.locations += self.locations
+
+        # This allows template files to be specified relative to the configuration file.
+        command.locations.append(os.path.join(self.directory, "templates"))
+        command.locations.append(self.directory)
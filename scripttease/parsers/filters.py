@@ -0,0 +1,415 @@
+# Imports
+
+from fnmatch import fnmatchcase
+import re
+
+# Exports
+
+__all__ = (
+    "ATTRIBUTES",
+    "compile_filter",
+    "is_expression",
+    "Filter",
+)
+
+# Constants
+
+ATTRIBUTES = {
+    'command': "name",
+    'comment': "comment",
+    'env': "environments",
+    'environment': "environments",
+    'environments': "environments",
+    'environs': "environments",
+    'envs': "environments",
+    'name': "name",
+    'section': "comment",
+    'tag': "tags",
+    'tags': "tags",
+}
+"""The attribute names that may be used in a filter expression and the command attribute to which each refers."""
+
+KEYWORDS = ("and", "not", "or")
+
+TOKEN = re.compile(r'\s*(?:(\()|(\))|([\w-]+):("(?:[^"\\]|\\.)*"|/(?:[^/\\]|\\.)*/|[^\s()]+)|([^\s()]+))')
+
+# Functions
+
+
+def compile_filter(expression):
+    """Compile a filter expression.
+
+    :param expression: The expression to be compiled.
+    :type expression: str
+
+    :rtype: Filter
+
+    :raise: ValueError
+    :raises: ``ValueError`` if the expression is not valid.
+
+    An expression is made up of ``attribute:value`` terms that may be combined with ``and``, ``or``, ``not`` and
+    parentheses. Terms that are not separated by ``or`` must all match.
+
+    .. code-block:: text
+
+        env:live and (tags:web or tags:django) and not comment:"install *"
+        section:/^create .* directory$/ or name:pip*
+
+    Values may include shell-style wildcards, or may be given as a regular expression between slashes. A command
+    matches an ``env`` term when the command has no environments.
+
+    """
+    tokens = _tokenize(expression)
+    if not tokens:
+        raise ValueError("Filter expression is empty.")
+
+    node, position = _parse_or(tokens, 0)
+    if position < len(tokens):
+        raise ValueError("Unexpected %s in filter expression: %s" % (tokens[position][1], expression))
+
+    return Filter(expression, node)
+
+
+def is_expression(value):
+    """Indicates whether a filter is an expression rather than a single ``attribute:value`` pair.
+
+    :param value: The filter.
+    :type value: str
+
+    :rtype: bool
+
+    """
+    tokens = _tokenize(value)
+    return len(tokens) != 1 or tokens[0][0] != "term" or tokens[0][1][1][:1] in ('"', "/")
+
+
+def _get_matcher(value):
+    """Get a function that matches a string against a filter value.
+
+    :param value: The value given in the expression.
+    :type value: str
+
+    :rtype: callable
+
+    """
+    if len(value) > 1 and value[0] == "/" and value[-1] == "/":
+        try:
+            pattern = re.compile(value[1:-1].replace("\\/", "/"))
+        except re.error as e:
+            raise ValueError("Invalid regular expression %s: %s" % (value, e))
+
+        return lambda x: x is not None and pattern.search(str(x)) is not None
+
+    if len(value) > 1 and value[0] == '"' and value[-1] == '"':
+        value = value[1:-1].replace('\\"', '"')
+
+    if any([c in value for c in "*?["]):
+        return lambda x: x is not None and fnmatchcase(str(x), value)
+
+    return lambda x: x is not None and str(x) == value
+
+
+def _parse_and(tokens, position):
+    """Parse the terms that must all match."""
+    nodes = list()
+
+    node, position = _parse_not(tokens, position)
+    nodes.append(node)
+
+    while position < len(tokens):
+        kind, value = tokens[position]
+        if kind == "keyword" and value == "and":
+            position += 1
+        elif kind == "term" or kind == "(" or (kind == "keyword" and value == "not"):
+            # Adjacent terms must also match.
+            pass
+        else:
+            break
+
+        node, position = _parse_not(tokens, position)
+        nodes.append(node)
+
+    if len(nodes) == 1:
+        return nodes[0], position
+
+    return _And(nodes), position
+
+
+def _parse_not(tokens, position):
+    """Parse a negated term, group, or a plain term."""
+    if position >= len(tokens):
+        raise ValueError("Filter expression ended unexpectedly.")
+
+    kind, value = tokens[position]
+    if kind == "keyword" and value == "not":
+        node, position = _parse_not(tokens, position + 1)
+        return _Not(node), position
+
+    if kind == "(":
+        node, position = _parse_or(tokens, position + 1)
+        if position >= len(tokens) or tokens[position][0] != ")":
+            raise ValueError("Missing closing parenthesis in filter expression.")
+
+        return node, position + 1
+
+    if kind == "term":
+        attribute, _value = value
+        return _Term(attribute, _value), position + 1
+
+    raise ValueError("Unexpected %s in filter expression." % (value or kind))
+
+
+def _parse_or(tokens, position):
+    """Parse alternatives, any of which may match."""
+    nodes = list()
+
+    node, position = _parse_and(tokens, position)
+    nodes.append(node)
+
+    while position < len(tokens) and tokens[position] == ("keyword", "or"):
+        node, position = _parse_and(tokens, position + 1)
+        nodes.append(node)
+
+    if len(nodes) == 1:
+        return nodes[0], position
+
+    return _Or(nodes), position
+
+
+def _tokenize(expression):
+    """Split an expression into tokens.
+
+    :rtype: list[tuple]
+    :returns: The kind and value of each token.
+
+    """
+    tokens = list()
+
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError("Invalid filter expression: %s" % expression)
+
+        position = match.end()
+
+        opening, closing, attribute, value, word = match.groups()
+        if opening:
+            tokens.append(("(", None))
+        elif closing:
+            tokens.append((")", None))
+        elif attribute:
+            if attribute.lower() not in ATTRIBUTES:
+                raise ValueError("Unknown filter attribute: %s" % attribute)
+
+            tokens.append(("term", (ATTRIBUTES[attribute.lower()], value)))
+        elif word.lower() in KEYWORDS:
+            tokens.append(("keyword", word.lower()))
+        else:
+            raise ValueError("Filters must be given as attribute:value, not: %s" % word)
+
+    return tokens
+
+# Classes
+
+
+class Filter(object):
+    """A compiled filter expression. See ``compile_filter()``."""
+
+    def __init__(self, expression, node):
+        """Initialize the filter.
+
+        :param expression: The original expression.
+        :type expression: str
+
+        :param node: The root of the compiled expression.
+
+        """
+        self.expression = expression
+        self._node = node
+
+    def __call__(self, command):
+        return self.match(command)
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.expression)
+
+    def __str__(self):
+        return self.expression
+
+    def filter(self, commands):
+        """Filter a list of commands.
+
+        :param commands: The commands to be filtered.
+        :type commands: list
+
+        :rtype: list
+
+        """
+        return [c for c in commands if self._node.match(c)]
+
+    def get_positions(self, index):
+        """Get the positions of the indexed commands that match the filter. Environment and tag terms are answered by
+        the index; other terms check each command.
+
+        :param index: The command index.
+        :type index: scripttease.parsers.utils.CommandIndex
+
+        :rtype: set[int]
+
+        """
+        return self._node.get_positions(index)
+
+    def match(self, command):
+        """Indicates whether a command matches the filter.
+
+        :param command: The command (or any object with ``comment``, ``environments``, ``name``, and ``tags``
+                        attributes).
+
+        :rtype: bool
+
+        """
+        return self._node.match(command)
+
+    def may_match(self, command):
+        """Indicates whether a command may match the filter when only its environments and tags are known. Other terms
+        are unknown, so ``False`` is returned only when no command with these environments and tags could match.
+
+        :param command: The command (or any object with ``environments`` and ``tags`` attributes).
+
+        :rtype: bool
+
+        """
+        return self._node.partial(command) is not False
+
+
+class _And(object):
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def get_positions(self, index):
+        positions = self.nodes[0].get_positions(index)
+        for node in self.nodes[1:]:
+            if not positions:
+                break
+
+            positions = positions & node.get_positions(index)
+
+        return positions
+
+    def match(self, command):
+        for node in self.nodes:
+            if not node.match(command):
+                return False
+
+        return True
+
+    def partial(self, command):
+        result = True
+        for node in self.nodes:
+            _result = node.partial(command)
+            if _result is False:
+                return False
+
+            if _result is None:
+                result = None
+
+        return result
+
+
+class _Not(object):
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_positions(self, index):
+        return set(range(len(index))) - self.node.get_positions(index)
+
+    def match(self, command):
+        return not self.node.match(command)
+
+    def partial(self, command):
+        result = self.node.partial(command)
+        if result is None:
+            return None
+
+        return not result
+
+
+class _Or(object):
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def get_positions(self, index):
+        return set().union(*[node.get_positions(index) for node in self.nodes])
+
+    def match(self, command):
+        for node in self.nodes:
+            if node.match(command):
+                return True
+
+        return False
+
+    def partial(self, command):
+        result = False
+        for node in self.nodes:
+            _result = node.partial(command)
+            if _result is True:
+                return True
+
+            if _result is None:
+                result = None
+
+        return result
+
+
+class _Term(object):
+
+    def __init__(self, attribute, value):
+        self.attribute = attribute
+        self.matcher = _get_matcher(value)
+        self.value = value
+
+    def get_positions(self, index):
+        if self.attribute == "environments":
+            positions = set(index.unrestricted)
+            for name, _positions in index.environments.items():
+                if self.matcher(name):
+                    positions |= _positions
+
+            return positions
+
+        if self.attribute == "tags":
+            positions = set()
+            for name, _positions in index.tags.items():
+                if self.matcher(name):
+                    positions |= _positions
+
+            return positions
+
+        return set([i for i, command in enumerate(index.commands) if self.match(command)])
+
+    def match(self, command):
+        value = getattr(command, self.attribute)
+
+        if self.attribute == "environments":
+            # Commands without environments apply to all environments.
+            if not value:
+                return True
+
+            return any([self.matcher(v) for v in value])
+
+        if self.attribute == "tags":
+            return any([self.matcher(v) for v in value or list()])
+
+        return self.matcher(value)
+
+    def partial(self, command):
+        # Only environments and tags are known before the command is created.
+        if self.attribute in ("environments", "tags"):
+            return self.match(command)
+
+        return None
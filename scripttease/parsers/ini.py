@@ -1,12 +1,10 @@
 # Imports
 
-from commonkit import parse_jinja_template, read_file, smart_cast, split_csv
-from configparser import ConfigParser, ParsingError
+from configparser import ConfigParser, DEFAULTSECT, DuplicateSectionError, Error as ConfigParserError
+from jinja2.exceptions import TemplateError
 import logging
-import os
 from ..constants import LOGGER_NAME
-from ..library.commands import ItemizedCommand
-from ..library.commands.templates import Template
+from ..library.commands.templates import iter_jinja_template
 from .base import Parser
 
 log = logging.getLogger(LOGGER_NAME)
@@ -17,163 +15,187 @@ __all__ = (
     "Config",
 )
 
+# Constants
+
+SECTIONS_PER_READ = 100
+"""The number of sections given to ``ConfigParser`` at a time. Each read has a fixed cost, so sections are read in
+groups rather than one at a time."""
+
 # Classes
 
 
 class Config(Parser):
     """An INI configuration for loading commands."""
 
-    def load(self):
-        """Load commands from a INI file."""
+    def __init__(self, path, strict=True, **kwargs):
+        """Initialize the configuration.
+
+        :param path: The path to the configuration file.
+        :type path: str
+
+        :param strict: Indicates that a duplicate section is an error, as with ``ConfigParser``. The name of every
+                       section must then be kept while the file is read. Set to ``False`` to read very large files in
+                       constant memory, in which case a duplicate section is loaded as another command.
+        :type strict: bool
+
+        kwargs are passed to ``Parser``.
+
+        """
+        super().__init__(path, **kwargs)
+
+        self.strict = strict
+
+    def iter_commands(self):
+        """Get the commands of an INI file as each is created. See ``Parser.iter_commands()``."""
         if not self.exists:
-            return False
+            return
 
         if not self.factory.load():
-            return False
-
-        ini = self._load_ini()
-        if ini is None:
-            return False
-
-        success = True
-        for comment in ini.sections():
-            args = list()
-            command_name = None
-            count = 0
-            kwargs = self.options.copy()
-            kwargs['comment'] = comment
-
-            for key, value in ini.items(comment):
-                # The first key/value pair is the command name and arguments.
-                if count == 0:
-                    command_name = key
-
-                    # Arguments surrounded by quotes are considered to be one argument. All others are split into a
-                    # list to be passed to the callback. It is also possible that this is a call where no arguments are
-                    # present, so the whole thing is wrapped to protect against an index error.
-                    try:
-                        if value[0] == '"':
-                            args.append(value.replace('"', ""))
-                        else:
-                            args = value.split(" ")
-                    except IndexError:
-                        pass
-                else:
-                    _key, _value = self._get_key_value(key, value)
-
-                    kwargs[_key] = _value
-
-                count += 1
-
-            command = self.factory.get_command(command_name, *args, **kwargs)
-            if command is not None:
-                if isinstance(command, self.factory.overlay.Function):
-                    self._functions.append(command)
-                elif isinstance(command, Template):
-                    self._load_template(command)
-                    self._commands.append(command)
-                elif isinstance(command, ItemizedCommand):
-                    itemized_template = False
-                    for c in command.get_commands():
-                        if isinstance(c, Template):
-                            itemized_template = True
-                            self._load_template(c)
-                            self._commands.append(c)
-
-                    if not itemized_template:
-                        self._commands.append(command)
-                else:
-                    self._commands.append(command)
-
-                # if isinstance(command, Function):
-                #     self._functions.append(command)
-                # elif isinstance(command, Include):
-                #     subcommands = self._load_include(command)
-                #     if subcommands is not None:
-                #         self._commands += subcommands
-                # elif isinstance(command, Template):
-                #     self._load_template(command)
-                #     self._commands.append(command)
-                # elif isinstance(command, ItemizedCommand) and issubclass(command.command_class, Template):
-                #     for c in command.get_commands():
-                #         self._load_template(c)
-                #         self._commands.append(c)
-                # else:
-                #     self._commands.append(command)
-            else:
-                success = False
-
-        self.is_loaded = success
-        return self.is_loaded
-
-    # noinspection PyMethodMayBeStatic
-    def _get_key_value(self, key, value):
-        """Process a key/value pair from an INI section.
-
-        :param key: The key to be processed.
-        :type key: str
-
-        :param value: The value to be processed.
-
-        :rtype: tuple
-        :returns: The key and value, both of which may be modified from the originals.
+            return
 
-        """
-        if key in ("environments", "environs", "envs", "env"):
-            _key = "environments"
-            _value = split_csv(value)
-        elif key in ("func", "function"):
-            _key = "function"
-            _value = value
-        elif key == "items":
-            _key = "items"
-            _value = split_csv(value)
-        elif key == "tags":
-            _key = "tags"
-            _value = split_csv(value)
-        else:
-            _key = key
-            _value = smart_cast(value)
-
-        return _key, _value
-
-    def _load_ini(self):
-        """Load the configuration file.
-
-        :rtype: ConfigParser | None
+        # Sections are read and parsed a group at a time, and turned into commands one at a time.
+        specs = self._get_specs(self._iter_sections())
+
+        try:
+            for command in self._iter_commands(specs):
+                yield command
+        except ConfigParserError as e:
+            log.error("Failed to parse %s: %s" % (self.path, e))
+            self.is_loaded = False
+            return
+        except TemplateError as e:
+            log.error("Failed to parse %s as template: %s" % (self.path, e))
+            self.is_loaded = False
+            return
+
+        self.is_loaded = self.failed == 0
+
+    def _iter_sections(self):
+        """Read the sections of the configuration file a group at a time.
+
+        :rtype: collections.Iterable[tuple]
+        :returns: The name of each section and a list of its key/value pairs, in the order they appear in the file.
+
+        :raise: configparser.Error, TemplateError
+        :raises: ``configparser.Error`` if the file is not valid, or ``TemplateError`` if the file could not be parsed
+                 as a template.
+
+        Sections are parsed by ``ConfigParser`` in groups (see ``SECTIONS_PER_READ``), so values (including
+        interpolation and continuation lines) are the same as for a file that is read all at once. Only the current
+        group of sections is held in memory.
+
+        .. note::
+            Default values apply to the sections that come *after* the ``[DEFAULT]`` section. They are given after the
+            keys of the section, and so are never taken as the command name.
 
         """
         ini = ConfigParser()
-        if self.context is not None:
-            try:
-                content = parse_jinja_template(self.path, self.context)
-            except Exception as e:
-                log.error("Failed to parse %s as template: %s" % (self.path, e))
-                return None
-        else:
-            content = read_file(self.path)
 
-        try:
-            ini.read_string(content)
-            return ini
-        except ParsingError as e:
-            log.error("Failed to parse %s: %s" % (self.path, e))
-            return None
+        group = set()
+        headers = list()
+        lines = list()
+        names = set()
+
+        for line in self._read_lines():
+            # Headers are not indented. An indented header is the continuation of a value.
+            match = ConfigParser.SECTCRE.match(line.strip()) if line[:1] == "[" else None
+            if match is not None:
+                header = match.group("header")
+
+                # A group ends before the default section so that its values apply only to the sections that follow,
+                # and before a duplicate section so that it is loaded as another command when not strict.
+                if header == DEFAULTSECT or header in group or len(headers) >= SECTIONS_PER_READ:
+                    for section in self._read_sections(ini, headers, lines):
+                        yield section
+
+                    group = set()
+                    headers = list()
+                    lines = list()
 
-    def _load_template(self, command):
-        """Load additional resources for a template command.
+                if self.strict:
+                    if header in names:
+                        raise DuplicateSectionError(header, source=self.path)
 
-        :param command: The template command.
-        :type command: Template
+                    if header != DEFAULTSECT:
+                        names.add(header)
+
+                if header != DEFAULTSECT:
+                    group.add(header)
+                    headers.append(header)
+
+            lines.append(line)
+
+        for section in self._read_sections(ini, headers, lines):
+            yield section
+
+    def _get_items(self, ini, section):
+        """Get the key/value pairs of a section. The keys of the section come first, so that the command name remains
+        the first key, followed by any default values that the section does not override.
+
+        :param ini: The parser from which the section has been read.
+        :type ini: ConfigParser
+
+        :param section: The name of the section.
+        :type section: str
+
+        :rtype: list[tuple]
 
         """
-        # This may produce problems if template kwargs are the same as the given context.
-        if self.context is not None:
-            command.context.update(self.context)
+        # All of the values are interpolated at once, which is much quicker than getting each value on its own.
+        items = ini.items(section)
+        if not ini.defaults():
+            return items
+
+        values = dict(items)
+
+        # noinspection PyProtectedMember
+        options = ini._sections[section]
+        keys = list(options) + [key for key in values if key not in options]
+
+        return [(key, values[key]) for key in keys]
+
+    def _read_lines(self):
+        """Read the lines of the configuration file, first rendering the file as a template when a context has been
+        given.
+
+        :rtype: collections.Iterable[str]
 
-        # Custom locations come before default locations.
-        command.locations += self.locations
+        """
+        if self.context is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    yield line
+
+            return
+
+        # Output is produced by the template in pieces which do not correspond to lines.
+        remainder = ""
+        for chunk in iter_jinja_template(self.path, self.context, cache_path=self.cache_path):
+            lines = (remainder + chunk).split("\n")
+            remainder = lines.pop()
+            for line in lines:
+                yield line + "\n"
+
+        if remainder:
+            yield remainder
+
+    def _read_sections(self, ini, headers, lines):
+        """Parse a group of sections, removing each from the parser once it has been read.
+
+        :param ini: The parser.
+        :type ini: ConfigParser
+
+        :param headers: The names of the sections in the group, in the order they appear in the file.
+        :type headers: list[str]
+
+        :param lines: The lines of the group.
+        :type lines: list[str]
+
+        :rtype: collections.Iterable[tuple]
+
+        """
+        ini.read_string("".join(lines), source=self.path)
 
-        # This allows template files to be specified relative to the configuration file.
-        command.locations.append(os.path.join(self.directory, "templates"))
-        command.locations.append(self.directory)
+        for header in headers:
+            yield header, self._get_items(ini, header)
+            ini.remove_section(header)
@@ -1,22 +1,33 @@
 # Imports
 
+from collections import ChainMap
+from collections.abc import Mapping
 from commonkit import any_list_item, smart_cast, split_csv
 from configparser import RawConfigParser
+import heapq
 import logging
 import os
 from ..constants import LOGGER_NAME
 from .ini import Config
+from .yaml import YAML
 
 log = logging.getLogger(LOGGER_NAME)
 
+# Caches
+
+_variables = dict()
+
 # Exports
 
 __all__ = (
     "filter_commands",
+    "iter_statements",
     "load_commands",
     "load_config",
     "load_variables",
+    "CommandIndex",
     "Context",
+    "ContextView",
     "Variable",
 )
 
@@ -27,7 +38,7 @@ def filter_commands(commands, environments=None, tags=None):
     """Filter commands based on the given criteria. 
     
     :param commands: The commands to be filtered.
-    :type commands: list
+    :type commands: list | CommandIndex
     
     :param environments: Environment names to be matched.
     :type environments: list[str]
@@ -35,7 +46,14 @@ def filter_commands(commands, environments=None, tags=None):
     :param tags: Tag names to be matched.
     :type tags: list[str]
 
+    .. tip::
+        Use a ``CommandIndex`` when the same commands are filtered many times. An index may be given in place of the
+        commands, and ``Parser.get_command_index()`` keeps one for the commands of a loaded configuration.
+
     """
+    if isinstance(commands, CommandIndex):
+        return commands.filter(environments=environments, tags=tags)
+
     filtered = list()
     for command in commands:
         if environments is not None and len(command.environments) > 0:
@@ -51,6 +69,57 @@ def filter_commands(commands, environments=None, tags=None):
     return filtered
 
 
+def iter_statements(path, filters=None, overlay="ubuntu", **kwargs):
+    """Get the statements of the commands in a configuration file. Each section of the file is read, turned into a
+    command, filtered, and rendered before the next section is read, so memory use does not grow with the size of the
+    file.
+
+    :param path: The path to the configuration file.
+    :type path: str
+
+    :param filters: Used to filter commands.
+    :type filters: dict | scripttease.parsers.filters.Filter
+
+    :param overlay: The name of the command overlay to apply to generated commands.
+    :type overlay: str
+
+    :rtype: collections.Iterable[str]
+    :returns: The statement of each command, as output by the ``tease`` command.
+
+    :raise: RuntimeError
+    :raises: ``RuntimeError`` if the configuration could not be loaded. Because statements are produced as the file is
+             read, this may occur after some statements have been produced.
+
+    kwargs are passed to the configuration class for instantiation.
+
+    .. code-block:: python
+
+        with open("commands.sh", "w") as f:
+            for statement in iter_statements("commands.ini", filters={'environments': ["live"]}):
+                f.write(statement)
+                f.write("\n\n")
+
+    .. note::
+        Commands that belong to a function are not included. Use ``load_config()`` and ``as_script()`` for scripts
+        with functions.
+
+    """
+    _config = _get_config(path, overlay, filters=filters, **kwargs)
+    if _config is None:
+        raise RuntimeError("Failed to load config file: %s" % path)
+
+    for command in _config.iter_commands():
+        if command.function is not None:
+            continue
+
+        statement = command.get_statement(cd=True)
+        if statement is not None:
+            yield statement
+
+    if not _config.is_loaded:
+        raise RuntimeError("Failed to load config file: %s" % path)
+
+
 def load_commands(path, filters=None, overlay="ubuntu", **kwargs):
     """Load commands from a configuration file.
 
@@ -58,7 +127,7 @@ def load_commands(path, filters=None, overlay="ubuntu", **kwargs):
     :type path: str
 
     :param filters: Used to filter commands.
-    :type filters: dict
+    :type filters: dict | scripttease.parsers.filters.Filter
 
     :param overlay: The name of the command overlay to apply to generated commands.
     :type overlay: str
@@ -71,20 +140,12 @@ def load_commands(path, filters=None, overlay="ubuntu", **kwargs):
     kwargs are passed to the configuration class for instantiation.
 
     """
-    _config = load_config(path, overlay, **kwargs)
+    # Filters are applied by the configuration so that commands which are excluded are never created.
+    _config = load_config(path, overlay, filters=filters, **kwargs)
     if _config is None:
         return None
 
-    commands = _config.get_commands()
-
-    if filters is not None:
-        criteria = dict()
-        for attribute, values in filters.items():
-            criteria[attribute] = values
-
-        commands = filter_commands(commands, **criteria)
-
-    return commands
+    return _config.get_commands()
 
 
 def load_config(path, overlay="ubuntu", **kwargs):
@@ -101,12 +162,8 @@ def load_config(path, overlay="ubuntu", **kwargs):
     kwargs are passed to the configuration class for instantiation.
 
     """
-    if path.endswith(".ini"):
-        _config = Config(path, overlay=overlay, **kwargs)
-    # elif path.endswith(".yml"):
-    #     _config = YAML(path, **kwargs)
-    else:
-        log.warning("Input file format is not currently supported: %s" % path)
+    _config = _get_config(path, overlay, **kwargs)
+    if _config is None:
         return None
 
     if not _config.load():
@@ -139,13 +196,77 @@ def load_variables(path, environment=None):
         return list()
 
 
+def _get_config(path, overlay, **kwargs):
+    """Get the configuration class instance for a file, based on the file's extension. See ``load_config()``.
+
+    :rtype: Config | YAML | None
+
+    """
+    if path.endswith(".ini"):
+        return Config(path, overlay=overlay, **kwargs)
+
+    if path.endswith(".yml") or path.endswith(".yaml"):
+        return YAML(path, overlay=overlay, **kwargs)
+
+    log.warning("Input file format is not currently supported: %s" % path)
+    return None
+
+
+def _get_variable(spec):
+    """Create a variable from the name and attributes read from a file. See ``_read_variables_ini()``.
+
+    :param spec: The name and attributes of the variable.
+    :type spec: tuple
+
+    :rtype: Variable
+
+    """
+    name, kwargs = spec
+
+    _kwargs = dict(kwargs)
+    if "tags" in _kwargs:
+        _kwargs['tags'] = list(_kwargs['tags'])
+
+    return Variable(name, **_kwargs)
+
+
 def _load_variables_ini(path, environment=None):
-    """Load variables from an INI file. See ``load_variables()``."""
+    """Load variables from an INI file. See ``load_variables()``.
+
+    The variables of a file are read once (until the file changes) and grouped by environment, so that the variables of
+    any one environment are found without checking every variable. New ``Variable`` instances are returned by each
+    call, so that changes made by one caller are not seen by another.
+
+    """
+    mtime = os.stat(path).st_mtime_ns
+    if path in _variables and _variables[path][0] == mtime:
+        specs, environments = _variables[path][1:]
+    else:
+        specs, environments = _read_variables_ini(path)
+        _variables[path] = (mtime, specs, environments)
+
+    if environment is None:
+        return [_get_variable(spec) for spec in specs]
+
+    # Variables without an environment apply to all environments. The original order of the file is kept.
+    positions = heapq.merge(environments.get(None, list()), environments.get(environment, list()))
+
+    return [_get_variable(specs[i]) for i in positions]
 
+
+def _read_variables_ini(path):
+    """Read the variables of an INI file.
+
+    :rtype: tuple
+    :returns: A list of the name and attributes of each variable, and a dictionary of the positions of the variables
+              that belong to each environment.
+
+    """
     ini = RawConfigParser()
     ini.read(path)
 
     a = list()
+    environments = dict()
     for section in ini.sections():
         if ":" in section:
             variable_name, _environment = section.split(":")
@@ -164,23 +285,114 @@ def _load_variables_ini(path, environment=None):
 
             _kwargs[key] = value
 
-        a.append(Variable(variable_name, **_kwargs))
+        environments.setdefault(_environment, list()).append(len(a))
+        a.append((variable_name, _kwargs))
 
-    if environment is not None:
-        b = list()
-        for var in a:
-            if var.environment and var.environment == environment or var.environment is None:
-                b.append(var)
+    return a, environments
 
-        return b
+# Classes
 
-    return a
 
-# Classes
+class CommandIndex(object):
+    """An index of commands by environment and tag, so that the same commands may be filtered many times over without
+    checking every command."""
+
+    def __init__(self, commands):
+        """Initialize the index.
+
+        :param commands: The commands to be indexed.
+        :type commands: list
+
+        """
+        self.commands = list(commands)
+        self.environments = dict()
+        self.tags = dict()
+        self.unrestricted = set()
+
+        for position, command in enumerate(self.commands):
+            # Commands without environments apply to all environments.
+            environments = command.environments or list()
+            if len(environments) == 0:
+                self.unrestricted.add(position)
+
+            for name in environments:
+                self.environments.setdefault(name, set()).add(position)
+
+            for name in command.tags or list():
+                self.tags.setdefault(name, set()).add(position)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __repr__(self):
+        return "<%s (%s)>" % (self.__class__.__name__, len(self.commands))
+
+    def filter(self, environments=None, tags=None):
+        """Filter the commands in the same way as ``filter_commands()``.
+
+        :param environments: Environment names to be matched.
+        :type environments: list[str]
+
+        :param tags: Tag names to be matched.
+        :type tags: list[str]
+
+        :rtype: list
+        :returns: The matching commands in their original order.
+
+        """
+        positions = self.get_positions(environments=environments, tags=tags)
+        if positions is None:
+            return list(self.commands)
+
+        return [self.commands[i] for i in sorted(positions)]
+
+    def get_positions(self, environments=None, tags=None):
+        """Get the positions of the commands that match the given criteria.
+
+        :param environments: Environment names to be matched.
+        :type environments: list[str]
+
+        :param tags: Tag names to be matched.
+        :type tags: list[str]
+
+        :rtype: set[int] | None
+        :returns: The positions of matching commands, or ``None`` if no criteria were given.
+
+        """
+        positions = None
+
+        if environments is not None:
+            positions = self.unrestricted.union(*[self.environments.get(name, set()) for name in environments])
+
+        if tags is not None:
+            tagged = set().union(*[self.tags.get(name, set()) for name in tags])
+            if positions is None:
+                positions = tagged
+            else:
+                positions &= tagged
+
+        return positions
+
+    def select(self, expression):
+        """Get the commands that match a filter expression.
+
+        :param expression: The compiled expression.
+        :type expression: scripttease.parsers.filters.Filter
+
+        :rtype: list
+        :returns: The matching commands in their original order.
+
+        """
+        return [self.commands[i] for i in sorted(expression.get_positions(self))]
 
 
 class Context(object):
-    """A collection of variables."""
+    """A collection of variables, kept as a chain of layers.
+
+    Variables that are added to the context are stored in the first layer. Other contexts may be merged (as layers
+    that are searched later) or a child created (as a layer that is searched first) without copying any variables.
+
+    """
 
     def __init__(self, **kwargs):
         """Initialize the context.
@@ -188,7 +400,7 @@ class Context(object):
         kwargs are added as variable instances.
 
         """
-        self.variables = dict()
+        self.variables = ChainMap()
 
         for key, value in kwargs.items():
             self.add(key, value)
@@ -230,6 +442,22 @@ class Context(object):
 
         return v
 
+    def child(self, **kwargs):
+        """Create a context that layers additional variables over this one. This context is not changed.
+
+        kwargs are added as variable instances of the new context, and take precedence over variables of the same name.
+
+        :rtype: scripttease.parsers.utils.Context
+
+        """
+        context = Context()
+        context.variables = self.variables.new_child()
+
+        for key, value in kwargs.items():
+            context.variables[key] = Variable(key, value)
+
+        return context
+
     def get(self, name, default=None):
         """Get a the value of the variable from the context.
 
@@ -273,12 +501,11 @@ class Context(object):
 
         :rtype: dict
 
-        """
-        values = dict()
-        for key, var in self.variables.items():
-            values[key] = var.value or var.default
+        .. tip::
+            Use ``view()`` to look up values without creating a dictionary.
 
-        return values
+        """
+        return dict(self.view())
 
     def merge(self, context):
         """Merge another context with this one.
@@ -287,12 +514,45 @@ class Context(object):
         :type context: scripttease.parser.utils.Context
 
         .. note::
-            Variables that exist in the current context are *not* replaced with variables from the provided context.
+            Variables that exist in the current context are *not* replaced with variables from the provided context. The
+            variables of the provided context are not copied, so later changes to that context are also seen here.
 
         """
-        for name, var in context.variables.items():
-            if not self.has(name):
-                self.variables[name] = var
+        self.variables.maps.extend(context.variables.maps)
+
+    def view(self):
+        """Get a read-only mapping of the values of the context. Values are looked up as they are needed.
+
+        :rtype: ContextView
+
+        """
+        return ContextView(self)
+
+
+class ContextView(Mapping):
+    """A read-only mapping of variable names to the values of a context."""
+
+    def __init__(self, context):
+        """Initialize the view.
+
+        :param context: The context.
+        :type context: scripttease.parsers.utils.Context
+
+        """
+        self.context = context
+
+    def __getitem__(self, name):
+        var = self.context.variables[name]
+        return var.value or var.default
+
+    def __iter__(self):
+        return iter(self.context.variables)
+
+    def __len__(self):
+        return len(self.context.variables)
+
+    def __repr__(self):
+        return "<%s (%s)>" % (self.__class__.__name__, len(self))
 
 
 class Variable(object):
@@ -0,0 +1,136 @@
+# Imports
+
+from jinja2.exceptions import TemplateError
+import logging
+from ..constants import LOGGER_NAME
+from ..library.commands.templates import parse_jinja_template
+from .base import Parser
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Exports
+
+__all__ = (
+    "YAML",
+)
+
+# Functions
+
+
+def _import_yaml():
+    """Import PyYAML. It is imported only when a YAML file is loaded, as the import is slow.
+
+    :returns: The ``yaml`` module or ``None`` if PyYAML is not installed.
+
+    """
+    try:
+        import yaml
+    except ImportError:
+        return None
+
+    return yaml
+
+# Classes
+
+
+class YAML(Parser):
+    """A YAML configuration for loading commands.
+
+    Each document in the file is a mapping of sections, where the name of the section is the comment of the command and
+    the value is a mapping of the command and its parameters. As with an INI file, the command name *must* be the
+    *first* key in the section.
+
+    .. code-block:: yaml
+
+        create the web site directory:
+          mkdir: /var/www/domains/example_com/www
+          recursive: yes
+
+    A file may contain more than one document (separated by ``---``). Documents are read one at a time.
+
+    """
+
+    def iter_commands(self):
+        """Get the commands of a YAML file as each is created. See ``Parser.iter_commands()``."""
+        yaml = _import_yaml()
+        if yaml is None:
+            log.error("PyYAML must be installed to load YAML configurations.")
+            return
+
+        if not self.exists:
+            return
+
+        if not self.factory.load():
+            return
+
+        specs = self._get_specs(self._iter_sections())
+
+        try:
+            for command in self._iter_commands(specs):
+                yield command
+        except yaml.YAMLError as e:
+            log.error("Failed to parse %s: %s" % (self.path, e))
+            self.is_loaded = False
+            return
+        except TemplateError as e:
+            log.error("Failed to parse %s as template: %s" % (self.path, e))
+            self.is_loaded = False
+            return
+
+        self.is_loaded = self.failed == 0
+
+    def _iter_sections(self):
+        """Read the sections of each document in the configuration file.
+
+        :rtype: collections.Iterable[tuple]
+        :returns: The name of each section and a list of its key/value pairs, in the order they appear in the file.
+
+        :raise: yaml.YAMLError, TemplateError
+        :raises: ``yaml.YAMLError`` if the file is not valid, or ``TemplateError`` if the file could not be parsed as a
+                 template.
+
+        """
+        yaml = _import_yaml()
+
+        # Scalars are kept as strings (as with an INI file) and cast in the same way, so that values such as 0755 are
+        # not resolved as YAML 1.1 octals or other types. The C loader is much faster, but is only available when
+        # PyYAML has been built with libyaml.
+        loader = getattr(yaml, "CBaseLoader", yaml.BaseLoader)
+
+        if self.context is not None:
+            documents = yaml.load_all(parse_jinja_template(self.path, self.context, cache_path=self.cache_path),
+                                      Loader=loader)
+            for section in self._iter_documents(documents):
+                yield section
+
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for section in self._iter_documents(yaml.load_all(f, Loader=loader)):
+                yield section
+
+    # noinspection PyMethodMayBeStatic
+    def _iter_documents(self, documents):
+        """Get the sections of each document.
+
+        :param documents: The loaded documents.
+        :type documents: collections.Iterable[dict]
+
+        :rtype: collections.Iterable[tuple]
+
+        """
+        yaml = _import_yaml()
+
+        for document in documents:
+            # Empty documents are allowed.
+            if document is None:
+                continue
+
+            if not isinstance(document, dict):
+                raise yaml.YAMLError("A document must be a mapping of sections.")
+
+            for name, items in document.items():
+                if not isinstance(items, dict):
+                    raise yaml.YAMLError("Section must be a mapping: %s" % name)
+
+                yield str(name), list(items.items())
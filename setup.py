@@ -33,6 +33,9 @@ setup(
         "pygments",
         "python-commonkit",
     ],
+    extras_require={
+        'yaml': ["pyyaml"],
+    },
     # dependency_links=[
     #     "https://github.com/develmaycare/superpython",
     # ],
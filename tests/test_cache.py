@@ -0,0 +1,88 @@
+import os
+from scripttease.cache import *
+from scripttease.parsers.utils import load_commands
+
+
+def test_get_dependencies():
+    commands = load_commands("tests/examples/render_example.ini")
+    paths = get_dependencies(commands)
+    assert len(paths) == 3
+    assert os.path.abspath("tests/examples/templates/good.j2.txt") in paths
+
+    commands = load_commands("tests/examples/items_from_example.ini")
+    paths = get_dependencies(commands)
+    assert os.path.abspath("tests/examples/items.txt") in paths
+
+
+class TestRenderCache(object):
+
+    def test_clear(self, tmpdir):
+        cache = RenderCache(str(tmpdir))
+        cache.set("one", "testing")
+        cache.set("two", "testing")
+        assert cache.clear() == 2
+        assert cache.get("one") is None
+
+    def test_get(self, tmpdir):
+        cache = RenderCache(str(tmpdir.join("renders")))
+        assert cache.get("nonexistent") is None
+
+        dependency = tmpdir.join("template.txt")
+        dependency.write("testing")
+
+        assert cache.set("testing", "echo testing", dependencies=[str(dependency)]) is True
+        assert cache.get("testing") == "echo testing"
+
+        # A change to a dependency invalidates the entry.
+        dependency.write("testing again")
+        assert cache.get("testing") is None
+        assert not os.path.exists(os.path.join(cache.path, "testing.json"))
+
+        # A dependency that does not exist must continue not to exist.
+        missing = str(tmpdir.join("missing.txt"))
+        cache.set("testing", "echo testing", dependencies=[missing])
+        assert cache.get("testing") == "echo testing"
+
+        tmpdir.join("missing.txt").write("testing")
+        assert cache.get("testing") is None
+
+        # A partially written or corrupt entry is ignored.
+        with open(os.path.join(cache.path, "corrupt.json"), "w") as f:
+            f.write("{")
+
+        assert cache.get("corrupt") is None
+
+    def test_get_key(self, tmpdir):
+        cache = RenderCache(str(tmpdir))
+        assert cache.get_key("nonexistent.ini", "commands") is None
+
+        path = "tests/examples/kitchen_sink.ini"
+        key = cache.get_key(path, "commands", context={'testing': True})
+        assert key == cache.get_key(path, "commands", context={'testing': True})
+        assert key != cache.get_key(path, "commands", context={'testing': False})
+        assert key != cache.get_key(path, "script", context={'testing': True})
+        assert key != cache.get_key(path, "commands", context={'testing': True}, overlay="centos")
+        assert key != cache.get_key(path, "commands", context={'testing': True}, options={'sudo': True})
+
+    def test_prune(self, tmpdir):
+        cache = RenderCache(str(tmpdir), max_size=350)
+        cache.set("one", "a" * 100)
+        os.utime(os.path.join(cache.path, "one.json"), (1, 1))
+
+        cache.set("two", "b" * 100)
+        os.utime(os.path.join(cache.path, "two.json"), (2, 2))
+
+        # Using an entry makes it the most recently used.
+        assert cache.get("one") is not None
+
+        cache.set("three", "c" * 150)
+        assert cache.get("two") is None
+        assert cache.get("one") is not None
+        assert cache.get("three") is not None
+
+        cache.max_size = 10000
+        assert cache.prune() == 0
+
+    def test_repr(self):
+        cache = RenderCache("/tmp/renders")
+        assert repr(cache) == "<RenderCache /tmp/renders>"
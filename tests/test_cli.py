@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+# The cumulative time (in microseconds) that importing the cli may take before the arguments are parsed. Importing
+# commonkit, Jinja, and Pygments took about 190ms when they were imported up front.
+IMPORT_BUDGET = 100000
+
+
+def get_import_times(*args):
+    """Run the tease command with ``python -X importtime`` and get the cumulative import time of each module."""
+    code = "import sys; from scripttease.cli import main_command; sys.argv[0] = 'tease'; main_command()"
+
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code] + list(args),
+        capture_output=True,
+        env=env,
+        universal_newlines=True
+    )
+
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_import_time():
+    times = get_import_times("-v")
+    assert times['scripttease.cli'] < IMPORT_BUDGET
+
+    for name in ("commonkit", "jinja2", "pygments", "yaml"):
+        assert name not in times
+
+    # Modules that are not needed to output commands from an INI file are not imported.
+    times = get_import_times("tests/examples/python_examples.ini")
+    assert "scripttease.parsers.ini" in times
+
+    for name in ("concurrent.futures.process", "scripttease.cli.server", "socketserver", "yaml"):
+        assert name not in times
@@ -0,0 +1,134 @@
+import json
+import os
+import pytest
+from scripttease.cli.batch import *
+from scripttease.cli.renderer import Renderer
+
+EXAMPLES = os.path.abspath(os.path.join("tests", "examples"))
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    jobs = [
+        {'name': "python", 'path': os.path.join(EXAMPLES, "python_examples.ini"), 'filters': ["tags:python-support"]},
+        {'path': os.path.join(EXAMPLES, "template_example.ini"), 'output_file': "example.sh",
+         'variables': ["domain_tld:example_com"]},
+    ]
+
+    path = str(tmp_path / "jobs.jsonl")
+    with open(path, "w") as f:
+        for job in jobs:
+            f.write(json.dumps(job))
+            f.write("\n\n")
+
+    return path
+
+
+def test_load_manifest(manifest, tmp_path):
+    jobs = load_manifest(manifest, defaults={'mode': "docs", 'filters': None})
+    assert len(jobs) == 2
+    assert jobs[0]['name'] == "python"
+    assert jobs[0]['mode'] == "docs"
+    assert "filters" in jobs[0]
+    assert "filters" not in jobs[1]
+
+    # Names default to the line number and paths are relative to the manifest.
+    assert jobs[1]['name'] == "3"
+    assert jobs[1]['output_file'] == str(tmp_path / "example.sh")
+
+    path = str(tmp_path / "jobs.ini")
+    with open(path, "w") as f:
+        f.write("[DEFAULT]\npath = %s\n\n" % os.path.join(EXAMPLES, "template_example.ini"))
+        f.write("[example]\noutput_file = example.sh\nvariables = domain_tld:example_com, testing:yes\n\n")
+        f.write("[other]\nmode = script\ncontext = domain_tld:example_net, testing:yes\n")
+
+    jobs = load_manifest(path)
+    assert [job['name'] for job in jobs] == ["example", "other"]
+    assert jobs[0]['variables'] == ["domain_tld:example_com", "testing:yes"]
+    assert jobs[1]['mode'] == "script"
+    assert jobs[1]['context'] == {'domain_tld': "example_net", 'testing': True}
+    assert jobs[1]['path'] == os.path.join(EXAMPLES, "template_example.ini")
+
+    assert load_manifest("nonexistent.jsonl") is None
+
+    path = str(tmp_path / "jobs.json")
+    with open(path, "w") as f:
+        f.write("{}")
+
+    assert load_manifest(path) is None
+
+    path = str(tmp_path / "bad.jsonl")
+    with open(path, "w") as f:
+        f.write("not json\n")
+
+    assert load_manifest(path) is None
+
+    with open(path, "w") as f:
+        f.write("[1, 2]\n")
+
+    assert load_manifest(path) is None
+
+    with open(path, "w") as f:
+        f.write('{"name": "missing"}\n')
+
+    assert load_manifest(path) is None
+
+    path = str(tmp_path / "bad.ini")
+    with open(path, "w") as f:
+        f.write("nothing = here\n")
+
+    assert load_manifest(path) is None
+
+    with open(path, "w") as f:
+        f.write("[example]\npath = commands.ini\ncontext = foo\n")
+
+    assert load_manifest(path) is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(capsys, manifest, tmp_path, workers):
+    jobs = load_manifest(manifest)
+    assert run_batch(jobs, workers=workers) == 0
+
+    output, summary = capsys.readouterr()
+    assert output.startswith("# install the virtualenv package")
+    assert "/var/www/domains" not in output
+    assert "2 jobs, 0 failed" in summary
+    assert "%s workers" % workers in summary
+
+    with open(str(tmp_path / "example.sh"), "r") as f:
+        assert "mkdir -p /var/www/domains/example_com" in f.read()
+
+    jobs.append({'name': "missing", 'path': str(tmp_path / "nonexistent.ini")})
+    jobs.append({'name': "unwritable", 'path': os.path.join(EXAMPLES, "python_examples.ini"),
+                 'output_file': str(tmp_path / "nonexistent" / "output.sh")})
+    assert run_batch(jobs, workers=workers) == 1
+
+    output, summary = capsys.readouterr()
+    assert "4 jobs, 2 failed" in summary
+    assert "Configuration file could not be read" in summary
+    assert "Could not write to" in summary
+
+
+def test_run_batch_exception(capsys, manifest, monkeypatch):
+    render = Renderer.render
+
+    def _render(self, request):
+        if request['name'] == "python":
+            raise RuntimeError("testing")
+
+        return render(self, request)
+
+    monkeypatch.setattr(Renderer, "render", _render)
+
+    # The other jobs are still run.
+    jobs = load_manifest(manifest)
+    jobs.append({'name': "last", 'path': os.path.join(EXAMPLES, "python_examples.ini")})
+    assert run_batch(jobs, workers=1) == 1
+
+    output, summary = capsys.readouterr()
+    assert output.startswith("# install the virtualenv package")
+    assert "3 jobs, 1 failed" in summary
+    assert "python  failed" in summary
+    assert "    testing" in summary
+    assert "last    ok" in summary
@@ -0,0 +1,18 @@
+import pytest
+from scripttease.cli.initialize import *
+from scripttease.parsers.filters import Filter
+
+
+def test_filters_from_cli():
+    filters = filters_from_cli(["tags:web", "tags:django", "env:live"])
+    assert filters == {'environments': ["live"], 'tags': ["web", "django"]}
+
+    filters = filters_from_cli(["tags:web", "tags:django", "comment:install*"])
+    assert isinstance(filters, Filter)
+    assert str(filters) == "(tags:web or tags:django) and (comment:install*)"
+
+    filters = filters_from_cli(["env:live and not tags:web"])
+    assert isinstance(filters, Filter)
+
+    with pytest.raises(ValueError):
+        filters_from_cli(["nonexistent:web"])
@@ -0,0 +1,161 @@
+import json
+import os
+import pytest
+import socket
+import socketserver
+import threading
+from scripttease.cli.server import *
+from scripttease.client import render
+
+
+def send(socket_path, request):
+    """Send a request to the server as is, without the checks made by the client."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socket_path)
+    connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    response = connection.makefile("rb").readline()
+    connection.close()
+
+    return json.loads(response.decode("utf-8"))
+
+
+@pytest.fixture
+def server(tmp_path):
+    s = RenderServer(str(tmp_path / "tease.sock"), max_configs=2)
+    thread = threading.Thread(target=s.serve_forever)
+    thread.start()
+
+    yield s
+
+    s.shutdown()
+    s.server_close()
+    thread.join()
+
+
+class TestRenderServer(object):
+
+    def test_init(self, server):
+        assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+
+    def test_server_bind(self, monkeypatch, tmp_path):
+        modes = list()
+        server_bind = socketserver.UnixStreamServer.server_bind
+
+        def _server_bind(self):
+            server_bind(self)
+            modes.append(os.stat(self.socket_path).st_mode & 0o777)
+
+        monkeypatch.setattr(socketserver.UnixStreamServer, "server_bind", _server_bind)
+
+        # The socket is never accessible to others, even before it is changed to 600.
+        umask = os.umask(0)
+        try:
+            s = RenderServer(str(tmp_path / "tease.sock"))
+        finally:
+            assert os.umask(umask) == 0
+
+        s.server_close()
+        assert modes == [0o600]
+
+    def test_render(self, server):
+        response = render(server.socket_path, "tests/examples/python_examples.ini", filters=["tags:python-support"])
+        assert response['exit_code'] == 0
+        assert response['errors'] == list()
+        assert response['output'].count("\n\n") == 1
+
+        response = render(server.socket_path, "tests/examples/python_examples.ini", mode="docs")
+        assert response['output'].startswith("1. ")
+
+        response = render(server.socket_path, "tests/examples/function_examples.ini", mode="script")
+        assert "function apache_setup()" in response['output']
+
+        response = render(server.socket_path, "tests/examples/template_example.ini",
+                          variables=["domain_tld:example_com"])
+        assert "/var/www/domains/example_com" in response['output']
+
+        response = render(server.socket_path, "tests/examples/bad_examples.ini")
+        assert response['exit_code'] == 1
+        assert response['output'] is None
+        assert len(response['errors']) > 0
+
+        response = render(server.socket_path, "tests/examples/python_examples.ini", mode="nonexistent")
+        assert response['exit_code'] == 1
+
+        response = render(server.socket_path, "tests/examples/python_examples.ini", filters=["nonexistent:testing"])
+        assert response['exit_code'] == 1
+
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(server.socket_path)
+        connection.sendall(b"not json\n")
+        response = json.loads(connection.makefile("rb").readline().decode("utf-8"))
+        connection.close()
+        assert response['exit_code'] == 1
+
+    def test_malformed(self, server, monkeypatch):
+        requests = [
+            {'path': "tests/examples/python_examples.ini", 'context': ["a"]},
+            {'path': "tests/examples/python_examples.ini", 'variables': "abc"},
+            {'path': "tests/examples/python_examples.ini", 'variables': ["abc"]},
+            {'path': "tests/examples/python_examples.ini", 'filters': [1]},
+            {'path': "tests/examples/python_examples.ini", 'locations': "tests/examples/templates"},
+            {'path': "tests/examples/python_examples.ini", 'options': ["abc"]},
+            ["not", "a", "dictionary"],
+        ]
+        for request in requests:
+            response = send(server.socket_path, request)
+            assert response['exit_code'] == 1
+            assert response['output'] is None
+            assert len(response['errors']) == 1
+
+        # A response is sent even when rendering fails unexpectedly.
+        def render(request):
+            raise RuntimeError("testing")
+
+        monkeypatch.setattr(server.renderer, "render", render)
+        response = send(server.socket_path, {'path': "tests/examples/python_examples.ini"})
+        assert response['exit_code'] == 1
+        assert response['errors'] == ["Could not render request: testing"]
+
+    def test_configs(self, server, tmp_path):
+        items_path = str(tmp_path / "items.txt")
+        with open(items_path, "w") as f:
+            f.write("one\ntwo\n")
+
+        path = str(tmp_path / "commands.ini")
+        with open(path, "w") as f:
+            f.write("[touch files]\ntouch: /tmp/$item\nitems_from: items.txt\n")
+
+        render(server.socket_path, path)
+        assert len(server.renderer.configs) == 1
+        config = list(server.renderer.configs.values())[0][0]
+
+        # The loaded configuration is reused.
+        render(server.socket_path, path)
+        assert list(server.renderer.configs.values())[0][0] is config
+
+        # Other arguments load the configuration again.
+        render(server.socket_path, path, context={'testing': True})
+        assert len(server.renderer.configs) == 2
+
+        # The configuration is loaded again when a file it uses has changed.
+        with open(items_path, "w") as f:
+            f.write("one\ntwo\nthree\n")
+
+        response = render(server.socket_path, path)
+        assert "touch /tmp/three" in response['output']
+        assert config not in [c for c, dependencies in server.renderer.configs.values()]
+
+        # The least recently used configuration is discarded.
+        render(server.socket_path, "tests/examples/python_examples.ini")
+        assert len(server.renderer.configs) == 2
+
+
+def test_serve(tmp_path):
+    socket_path = str(tmp_path / "tease.sock")
+
+    # A server is already listening.
+    s = RenderServer(socket_path)
+    assert serve(socket_path) == 1
+
+    s.server_close()
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,76 @@
+import os
+from scripttease.cli.subcommands import *
+
+
+def test_output_commands(capsys, tmp_path):
+    assert output_commands("tests/examples/python_examples.ini") == 0
+    output = capsys.readouterr().out
+    assert "pip3 install" in output
+
+    path = str(tmp_path / "commands.sh")
+    assert output_commands("tests/examples/python_examples.ini", output_file=path) == 0
+    assert capsys.readouterr().out == ""
+
+    with open(path, "r") as f:
+        assert f.read() == output
+
+
+def test_output_docs(capsys, tmp_path):
+    assert output_docs("tests/examples/python_examples.ini") == 0
+    output = capsys.readouterr().out
+    assert output.startswith("1. ")
+
+    path = str(tmp_path / "docs.txt")
+    assert output_docs("tests/examples/python_examples.ini", output_file=path) == 0
+    with open(path, "r") as f:
+        assert f.read() == output
+
+
+def test_output_script(capsys, tmp_path):
+    path = str(tmp_path / "script.sh")
+    with open(path, "w") as f:
+        f.write("previous")
+
+    assert output_script("tests/examples/python_examples.ini", output_file=path) == 0
+    assert capsys.readouterr().out == ""
+
+    with open(path, "r") as f:
+        output = f.read()
+
+    assert output.startswith("#! /usr/bin/env bash")
+    assert os.listdir(str(tmp_path)) == ["script.sh"]
+
+    # Output is cached and written in the same way.
+    cache_path = str(tmp_path / "cache")
+    assert output_script("tests/examples/python_examples.ini", cache_path=cache_path) == 0
+    assert capsys.readouterr().out == output
+
+    assert output_script("tests/examples/python_examples.ini", cache_path=cache_path, output_file=path) == 0
+    with open(path, "r") as f:
+        assert f.read() == output
+
+    # Output cannot be written to a directory that does not exist.
+    assert output_script("tests/examples/python_examples.ini", output_file=str(tmp_path / "missing" / "x.sh")) == 1
+
+
+def test_write_file(tmp_path):
+    path = str(tmp_path / "deploy.sh")
+
+    umask = os.umask(0o022)
+    try:
+        assert write_file(path, ["one", "two"]) is True
+    finally:
+        os.umask(umask)
+
+    with open(path, "r") as f:
+        assert f.read() == "onetwo\n"
+
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+    # The mode of an existing file is kept.
+    os.chmod(path, 0o750)
+    assert write_file(path, ["three"]) is True
+    assert os.stat(path).st_mode & 0o777 == 0o750
+
+    # No temporary files are left behind.
+    assert os.listdir(str(tmp_path)) == ["deploy.sh"]
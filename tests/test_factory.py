@@ -25,6 +25,13 @@ class TestFactory(object):
         )
         assert isinstance(c, ItemizedCommand)
 
+        # Items may be read from a file.
+        c = f.get_command("pip", "$item", items_from="tests/examples/items.txt")
+        assert isinstance(c, ItemizedCommand)
+
+        c = f.get_command("pip", "$item", items_from="nonexistent.txt")
+        assert c is None
+
         # A good, normal command.
         c = f.get_command("pip", "django")
         assert isinstance(c, Command)
@@ -33,6 +40,52 @@ class TestFactory(object):
         c = f.get_command("pip")
         assert c is None
 
+    def test_get_commands(self):
+        f = Factory("ubuntu")
+        with pytest.raises(RuntimeError):
+            f.get_commands([("pip", ["django"], dict())])
+
+        f.load()
+
+        specs = [
+            ("pip", ["django"], {'comment': "install django"}),
+            ("pip", ["$item"], {'items': ["Pillow", "psycopg2-binary"]}),
+            ("nonexistent", list(), dict()),
+            ("pip", list(), dict()),
+            ("touch", ["/path/to/file.txt"], {'sudo': False}),
+        ]
+        commands, failures = f.get_commands(specs, options={'sudo': True})
+        assert len(commands) == 3
+        assert len(failures) == 2
+
+        assert isinstance(commands[0], Command)
+        assert commands[0].comment == "install django"
+        assert commands[0].sudo.enabled is True
+        assert isinstance(commands[1], ItemizedCommand)
+        assert commands[2].sudo.enabled is False
+
+        spec, errors = failures[1]
+        assert spec[0] == "pip"
+        assert errors == ["missing required argument: name"]
+
+        # The original specification is not modified.
+        assert specs[1][2] == {'items': ["Pillow", "psycopg2-binary"]}
+
+    def test_get_errors(self):
+        f = Factory("ubuntu")
+        with pytest.raises(RuntimeError):
+            f.get_errors("pip")
+
+        f.load()
+
+        assert len(f.get_errors("nonexistent")) == 1
+        assert f.get_errors("pip", "django") == list()
+        assert f.get_errors("pip", "$item", items=["django"]) == list()
+
+        # All problems are reported at once.
+        errors = f.get_errors("func", "one", "two", "three", "four", comment="testing", extra=True)
+        assert len(errors) == 3
+
     def test_load(self):
         f = Factory("nonexistent")
         assert f.load() is False
@@ -1,5 +1,9 @@
+import pickle
+import pytest
 from scripttease.library.commands.base import Command, ItemizedCommand, Sudo
 from scripttease.library.overlays.common import python_pip
+from scripttease.library.overlays.posix import certbot, mkdir, symlink
+from scripttease.library.overlays.ubuntu import service_restart
 
 
 class TestCommand(object):
@@ -8,6 +12,12 @@ class TestCommand(object):
         c = Command("ls -ls", extra=True)
         assert c.extra is True
 
+        c = Command("ls -ls")
+        assert c.extra is None
+
+        with pytest.raises(AttributeError):
+            c.__nonexistent__
+
     def test_get_statement(self):
         c = Command(
             "ls -ls",
@@ -35,6 +45,19 @@ class TestCommand(object):
         statement = c.get_statement()
         assert "if [[ $?" in statement
 
+        # Statements are cached until the command changes.
+        c = Command("ls -ls", cd="/path/to/project", comment="listing")
+        statement = c.get_statement(cd=True)
+        assert c.get_statement(cd=True) is statement
+        assert c.get_statement(cd=False) != statement
+
+        c.cd = "/path/to/other"
+        assert "/path/to/other" in c.get_statement(cd=True)
+
+        c.get_statement()
+        c.set_attribute("testing", True)
+        assert c._statements is None
+
     def test_has_attribute(self):
         c = Command("ls -ls")
         assert c.has_attribute("testing") is False
@@ -57,6 +80,11 @@ class TestCommand(object):
         assert c.sudo.user == "root"
         assert c.sudo.enabled is False
 
+        # Sudo instances are shared and commands do not have an instance dictionary.
+        assert Command("ls -ls", sudo="deploy").sudo is Command("pwd", sudo="deploy").sudo
+        assert Command("ls -ls").sudo is Command("pwd").sudo
+        assert not hasattr(c, "__dict__")
+
     def test_is_itemized(self):
         c = Command("ls -ls")
         assert c.is_itemized is False
@@ -73,6 +101,7 @@ class TestCommand(object):
         assert c.testing is None
         c.set_attribute("testing", True)
         assert c.testing is True
+        assert c.has_attribute("testing") is True
 
 
 class TestItemizedCommand(object):
@@ -81,12 +110,35 @@ class TestItemizedCommand(object):
         c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item", extra=True)
         assert c.extra is True
 
+    def test_get_command_class(self):
+        c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item")
+        assert c.get_command_class() is Command
+
+        c = ItemizedCommand(Command, ["ls", "pwd"], "$item")
+        assert c.get_command_class() is Command
+
+        c = ItemizedCommand(python_pip, list(), "$item")
+        assert c.get_command_class() is None
+
     def test_get_commands(self):
         c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item")
         commands = c.get_commands()
         for i in commands:
             assert isinstance(i, Command)
 
+    def test_iter_commands(self):
+        c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item")
+        commands = c.iter_commands()
+        assert next(commands).get_statement(suppress_comment=True) == "pip3 install Pillow"
+
+    def test_iter_items(self):
+        c = ItemizedCommand(python_pip, None, "$item", items_from="tests/examples/items.txt")
+        assert list(c.iter_items()) == ["Pillow", "psycopg2-binary", "django"]
+
+        c = ItemizedCommand(python_pip, ["celery"], "$item", items_from="tests/examples/items.txt")
+        assert list(c.iter_items()) == ["celery", "Pillow", "psycopg2-binary", "django"]
+        assert "pip3 install django" in c.get_statement()
+
     def test_get_statement(self):
         c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item")
         statement = c.get_statement()
@@ -94,6 +146,41 @@ class TestItemizedCommand(object):
         assert "psycopg2-binary" in statement
         assert "django" in statement
 
+        c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item", loop=True, sudo=True)
+        statement = c.get_statement()
+        assert "# install $item" in statement
+        assert "for item in Pillow psycopg2-binary django; do" in statement
+        assert "sudo -u root pip3 install ${item}" in statement
+        assert statement.count("pip3") == 1
+
+        c = ItemizedCommand(mkdir, ["www", "www/assets"], "/var/www/$item", cd="/tmp", loop=True)
+        statement = c.get_statement(cd=True, suppress_comment=True)
+        assert "( cd /tmp && mkdir -p /var/www/${item} )" in statement
+        assert "#" not in statement
+
+        # Items that would need quoting are unrolled.
+        c = ItemizedCommand(python_pip, ["Pillow", "django<3"], "$item", loop=True)
+        statement = c.get_statement()
+        assert "for item" not in statement
+        assert "pip3 install django<3" in statement
+
+        # Variable names derived from the item are unrolled.
+        c = ItemizedCommand(service_restart, ["nginx", "postgresql"], "$item", loop=True)
+        statement = c.get_statement()
+        assert "for item" not in statement
+        assert "nginx_restarted=$?" in statement
+
+        # Items that are transformed by the callback are unrolled.
+        c = ItemizedCommand(symlink, ["/opt/a/bin", "/opt/b/bin"], "$item", loop=True)
+        statement = c.get_statement()
+        assert "for item" not in statement
+        assert "ln -s /opt/a/bin bin" in statement
+
+        c = ItemizedCommand(certbot, ["example.com", "example.net"], "$item", email="admin@example.com", loop=True)
+        statement = c.get_statement()
+        assert "for item" not in statement
+        assert "/var/www/domains/example_com/www -d example.com" in statement
+
     def test_has_attribute(self):
         c = ItemizedCommand(python_pip, ["Pillow", "psycopg2-binary", "django"], "$item")
         assert c.has_attribute("testing") is False
@@ -115,6 +202,28 @@ class TestItemizedCommand(object):
 
 class TestSudo(object):
 
+    def test_get(self):
+        assert Sudo.get() is Sudo.get(enabled=True, user="root")
+        assert Sudo.get(user="deploy") is not Sudo.get()
+        assert Sudo.get(user="deploy").user == "deploy"
+
+    def test_immutable(self):
+        # Shared instances may not be modified, so a change cannot affect other commands.
+        s = Command("ls", sudo=True).sudo
+        with pytest.raises(AttributeError):
+            s.user = "deploy"
+
+        with pytest.raises(AttributeError):
+            s.enabled = False
+
+        with pytest.raises(AttributeError):
+            del s.user
+
+        assert Command("ls", sudo=True).sudo.user == "root"
+        assert Sudo(True, "deploy") == Sudo.get(user="deploy")
+        assert len({Sudo(), Sudo(), Sudo(True)}) == 2
+        assert pickle.loads(pickle.dumps(s)) == s
+
     def test_bool(self):
         s = Sudo()
         assert bool(s) is False
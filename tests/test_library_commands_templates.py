@@ -1,5 +1,124 @@
 from scripttease.library.commands.base import Command, ItemizedCommand, Sudo
-from scripttease.library.commands.templates import Template
+import os
+import pytest
+from scripttease.library.commands.templates import *
+
+
+def test_get_environment(tmp_path):
+    env = get_environment(["tests/examples/templates"])
+    assert env is get_environment(["tests/examples/templates"])
+    assert env.bytecode_cache is None
+
+    env = get_environment(["tests/examples/templates"], cache_path=str(tmp_path))
+    assert env is not get_environment(["tests/examples/templates"])
+    assert env.bytecode_cache is not None
+
+
+def test_get_simple_template(tmp_path):
+    path = tmp_path / "simple.txt"
+    path.write_text("$one$ and $two$")
+
+    template = get_simple_template(str(path))
+    assert template is get_simple_template(str(path))
+
+    # The template is compiled again when the file changes.
+    path.write_text("$three$")
+    os.utime(str(path), ns=(0, 0))
+    assert get_simple_template(str(path)).placeholders == {"three"}
+
+
+def test_render_templates():
+    context = {
+        'testing': "yes",
+        'times': 123,
+    }
+    templates = [
+        Template("good.j2.txt", "tests/tmp/good.txt", context=context, locations=["tests/examples/templates"]),
+        Template("nonexistent.j2.txt", "tests/tmp/nonexistent.txt"),
+        Template("simple.txt", "tests/tmp/simple.txt", context=context, locations=["tests/examples/templates"],
+                 parser=Template.PARSER_SIMPLE),
+        Template("bad.j2.txt", "tests/tmp/bad.txt", locations=["tests/examples/templates"]),
+        Template("nonexistent.txt", "tests/tmp/nonexistent.txt", parser=Template.PARSER_SIMPLE),
+    ]
+
+    for executor in (EXECUTOR_PROCESS, EXECUTOR_THREAD):
+        errors = render_templates(templates, executor=executor, workers=2)
+        assert len(errors) == 3
+        assert errors[0][0] is templates[1]
+        assert errors[1][0] is templates[3]
+        assert "Could not parse" in errors[1][1]
+        assert errors[2] == (templates[4], "Template not found: nonexistent.txt")
+
+        assert "I am testing? yes" in templates[0].content
+        assert "How many times? 123" in templates[2].get_content()
+        assert templates[1].content is None
+
+    assert render_templates(list()) == list()
+
+    with pytest.raises(ValueError):
+        render_templates(templates, executor="nonexistent")
+
+
+def test_render_templates_keys():
+    context = {
+        'testing': "yes",
+        'zzz': "unused",
+    }
+
+    keys = list()
+    for executor in (EXECUTOR_PROCESS, EXECUTOR_THREAD):
+        template = Template("simple.txt", "tests/tmp/simple.txt", context=context,
+                            locations=["tests/examples/templates"], parser=Template.PARSER_SIMPLE)
+        assert render_templates([template], executor=executor) == list()
+        keys.append((template.missing_keys, template.unused_keys))
+
+    assert keys[0] == keys[1] == ({"times"}, {"zzz"})
+
+
+def test_iter_jinja_template():
+    context = {
+        'testing': "yes",
+        'times': 123,
+    }
+    chunks = iter_jinja_template("tests/examples/templates/good.j2.txt", context)
+    assert "".join(chunks) == parse_jinja_template("tests/examples/templates/good.j2.txt", context)
+
+
+def test_parse_jinja_template(tmp_path):
+    context = {
+        'testing': "yes",
+        'times': 123,
+    }
+    content = parse_jinja_template("tests/examples/templates/good.j2.txt", context, cache_path=str(tmp_path))
+    assert "I am testing? yes" in content
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+class TestSimpleTemplate(object):
+
+    def test_render(self):
+        t = SimpleTemplate("$greeting$, $name$! Cost: $5. Path: $HOME/bin:$PATH. Again: $name$")
+        content, missing, unused = t.render({'name': "Bob", 'unused': True})
+        assert content == "$greeting$, Bob! Cost: $5. Path: $HOME/bin:$PATH. Again: Bob"
+        assert missing == {"greeting"}
+        assert unused == {"unused"}
+
+        # The closing $ of text that is not a placeholder may open a placeholder.
+        t = SimpleTemplate("tar xf $NAME-$version$.tar.gz")
+        content, missing, unused = t.render({'version': "1.0"})
+        assert content == "tar xf $NAME-1.0.tar.gz"
+        assert missing == set()
+
+        content, missing, unused = t.render({'NAME-': "app"})
+        assert content == "tar xf appversion$.tar.gz"
+
+        content, missing, unused = t.render(dict())
+        assert content == "tar xf $NAME-$version$.tar.gz"
+        assert missing == {"NAME-", "version"}
+
+    def test_repr(self):
+        t = SimpleTemplate("$one$ $two$ $one$")
+        assert repr(t) == "<SimpleTemplate (2)>"
 
 
 class TestTemplate(object):
@@ -19,6 +138,7 @@ class TestTemplate(object):
         content = t.get_content()
         assert "I am testing? yes" in content
         assert "How many times? 123" in content
+        assert t.missing_keys == set()
 
         context = {
             'testing': "yes",
@@ -111,3 +231,28 @@ class TestTemplate(object):
             locations=["tests/examples/templates"]
         )
         assert t.get_template() == "tests/examples/templates/simple.txt"
+
+
+class TestTemplateIndex(object):
+
+    def test_find(self):
+        index = TemplateIndex()
+        assert index.find("simple.txt", ["nonexistent", "tests/examples/templates"]) == \
+            "tests/examples/templates/simple.txt"
+        assert index.find("templates/simple.txt", ["tests/examples"]) == "tests/examples/templates/simple.txt"
+        assert index.find("nonexistent.txt", ["tests/examples/templates"]) is None
+
+    def test_get_names(self, tmp_path):
+        index = TemplateIndex(interval=0)
+        assert index.get_names(str(tmp_path)) == frozenset()
+        assert index.get_names("nonexistent") == frozenset()
+
+        # A change to the directory is detected.
+        (tmp_path / "testing.txt").write_text("testing")
+        os.utime(str(tmp_path), ns=(0, 0))
+        assert "testing.txt" in index.get_names(str(tmp_path))
+
+    def test_repr(self):
+        index = TemplateIndex()
+        index.get_names("tests/examples/templates")
+        assert repr(index) == "<TemplateIndex (1)>"
@@ -0,0 +1,87 @@
+import pytest
+from scripttease.library.overlays import *
+from scripttease.library.overlays.posix import Function, mkdir
+from scripttease.library.overlays.ubuntu import MAPPINGS as UBUNTU_MAPPINGS
+
+
+def test_get_load_times():
+    get_overlay("ubuntu").command_exists("mkdir")
+    assert "ubuntu" in get_load_times()
+
+
+def test_get_overlay():
+    assert get_overlay("ubuntu") is get_overlay("ubuntu")
+
+    with pytest.raises(ImportError):
+        get_overlay("nonexistent")
+
+
+class TestLazyMappings(object):
+
+    def test_contains(self):
+        overlay = Overlay("ubuntu", OVERLAYS['ubuntu'])
+        assert "mkdir" in overlay.MAPPINGS
+        assert "nonexistent" not in overlay.MAPPINGS
+
+    def test_getitem(self):
+        overlay = Overlay("ubuntu", OVERLAYS['ubuntu'])
+        assert overlay.MAPPINGS['mkdir'] is mkdir
+
+        # Only the module containing the command has been loaded.
+        assert list(overlay._modules.keys()) == ["posix"]
+
+        with pytest.raises(KeyError):
+            overlay.MAPPINGS['nonexistent']
+
+    def test_iter(self):
+        overlay = Overlay("ubuntu", OVERLAYS['ubuntu'])
+        assert dict(overlay.MAPPINGS) == UBUNTU_MAPPINGS
+        assert len(overlay.MAPPINGS) == len(UBUNTU_MAPPINGS)
+
+    def test_repr(self):
+        overlay = Overlay("ubuntu", OVERLAYS['ubuntu'])
+        assert repr(overlay.MAPPINGS) == "<LazyMappings ubuntu>"
+
+
+class TestOverlay(object):
+
+    def test_command_exists(self):
+        overlay = get_overlay("centos")
+        assert overlay.command_exists("apache") is True
+        assert overlay.command_exists("nonexistent") is False
+
+    def test_getattr(self):
+        overlay = get_overlay("ubuntu")
+        assert overlay.Function is Function
+
+        with pytest.raises(AttributeError):
+            overlay.nonexistent
+
+    def test_load_time(self):
+        overlay = get_overlay("centos")
+        overlay.get_module("centos")
+        assert overlay.load_time >= 0
+
+    def test_repr(self):
+        assert repr(get_overlay("ubuntu")) == "<Overlay ubuntu>"
+
+
+class TestSignature(object):
+
+    def test_check(self):
+        s = Signature(mkdir)
+        assert s.check(["/path/to/dir"], dict()) == list()
+        assert s.check(["/path/to/dir"], {'mode': 755, 'comment': "testing"}) == list()
+        assert s.check(list(), dict()) == ["missing required argument: path"]
+        assert s.check(["/path/to/dir"], {'path': "/path/to/dir"}) == ["got multiple values for argument: path"]
+
+        s = Signature(Function)
+        assert s.check(["testing"], {'comment': "testing"}) == list()
+
+        errors = s.check(["one", "two", "three", "four"], {'extra': True})
+        assert "takes 3 positional arguments but 4 were given" in errors
+        assert "got an unexpected keyword argument: extra" in errors
+
+    def test_repr(self):
+        s = Signature(mkdir)
+        assert repr(s) == "<Signature mkdir>"
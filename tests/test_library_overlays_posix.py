@@ -235,6 +235,8 @@ class TestFunction(object):
         assert "function testing()" in s
         assert "touch /path/to/file.txt" in s
 
+        assert "".join(f.iter_chunks()) == s
+
 
 class TestPrompt(object):
 
@@ -1,3 +1,4 @@
+from io import StringIO
 from scripttease.library.commands import Command, ItemizedCommand
 from scripttease.library.overlays.posix import Function
 from scripttease.library.scripts import Script
@@ -29,3 +30,25 @@ class TestScript(object):
         assert "touch /path/to/file.txt" in output
         assert "ln -s /path/to/file.txt" in output
         assert "function testing()" in output
+
+    def test_write_to(self):
+        s = Script("testing")
+        s.append(Command("ls -ls", comment="list some stuff"))
+        s.append(Command("touch /path/to/file.txt", comment="touch a file"))
+
+        f = Function("testing")
+        f.commands.append(Command("ln -s /path/to/file.txt", comment="link to a file"))
+        s.functions = [f]
+
+        fp = StringIO()
+        s.write_to(fp)
+        assert fp.getvalue() == s.to_string()
+
+        fp = StringIO()
+        s.write_to(fp, shebang=None)
+        assert fp.getvalue() == s.to_string(shebang=None)
+        assert fp.getvalue().startswith("function testing()")
+
+        # Each statement is a separate chunk.
+        chunks = list(s.iter_chunks())
+        assert "# list some stuff\nls -ls" in chunks
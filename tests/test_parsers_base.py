@@ -3,6 +3,8 @@ from scripttease.library.overlays.posix import touch, Function
 from scripttease.library.scripts import Script
 # from scripttease.parsers import filter_commands, load_commands
 from scripttease.parsers.base import Parser
+from scripttease.parsers.filters import compile_filter
+from scripttease.parsers.ini import Config
 
 
 class TestParser(object):
@@ -11,9 +13,42 @@ class TestParser(object):
         p = Parser("/path/to/nonexistent.txt")
         assert isinstance(p.as_script(), Script)
 
-    # def test_get_commands(self):
-    #     pass
-    #
+    def test_filter_commands(self):
+        parser = Parser("/it/does/not/matter.ini")
+        parser._add_command(touch("/path/to/base.txt", environments=["base"], tags=["web"]))
+        parser._add_command(touch("/path/to/live.txt", environments=["live"]))
+        parser._add_command(touch("/path/to/any.txt", tags=["django"]))
+
+        assert len(parser.filter_commands({'environments': ["live"]})) == 2
+        assert len(parser.filter_commands({'tags': ["web", "django"]})) == 2
+        assert len(parser.filter_commands(compile_filter("env:base and not tags:django"))) == 1
+
+    def test_get_command_index(self, monkeypatch):
+        parser = Parser("/it/does/not/matter.ini")
+        parser._add_command(touch("/path/to/file.txt", tags=["web"]))
+
+        # The index is kept until more commands are loaded.
+        index = parser.get_command_index()
+        assert parser.get_command_index() is index
+
+        # The commands are not copied to check whether the index is current.
+        monkeypatch.setattr(parser, "get_commands", None)
+        assert parser.get_command_index() is index
+
+        parser._add_command(touch("/path/to/another.txt", tags=["web"]))
+        assert parser.get_command_index() is not index
+        assert len(parser.get_command_index()) == 2
+
+    def test_get_commands(self):
+        parser = Parser("/it/does/not/matter.ini")
+        parser._add_command(touch("/path/to/file.txt"))
+        parser._add_command(touch("/path/to/function.txt", function="testing"))
+        assert len(parser.get_commands()) == 1
+
+        # Commands added directly are also found.
+        parser._commands.append(touch("/path/to/another.txt"))
+        assert len(parser.get_commands()) == 2
+
     def test_get_functions(self):
         parser = Parser("/it/does/not/matter.ini")
 
@@ -24,7 +59,47 @@ class TestParser(object):
 
         assert len(parser.get_functions()) == 1
 
+        # Commands are not added to the function more than once.
+        parser.get_functions()
+        assert function.commands == [command]
+
+        parser._add_command(touch("/path/to/another.txt", function="testing"))
+        parser.get_functions()
+        assert len(function.commands) == 2
+
+    def test_get_templates(self):
+        c = Config("tests/examples/kitchen_sink.ini", context={'testing': "yes"})
+        c.load()
+        assert len(c.get_templates()) == 3
+
+    def test_iter_commands(self):
+        c = Config("tests/examples/python_examples.ini")
+        commands = list(c.iter_commands())
+        assert len(commands) == 3
+        assert c.is_loaded is True
+
+        # Commands are not kept.
+        assert len(c.get_commands()) == 0
+
+        c = Config("tests/examples/bad_command.ini")
+        assert len(list(c.iter_commands())) == 0
+        assert c.is_loaded is False
+        assert c.failed == 1
+
     def test_load(self):
         p = Parser("/path/to/nonexistent.txt")
         with pytest.raises(NotImplementedError):
             p.load()
+
+    def test_render_templates(self):
+        c = Config("tests/examples/render_example.ini")
+        c.load()
+        assert c.render_templates() is True
+
+        for t in c.get_templates():
+            assert "I am testing? ok" in t.content
+
+        c = Config("tests/examples/render_example.ini")
+        c.load()
+        c.get_templates()[0].source = "nonexistent.j2.txt"
+        assert c.render_templates(executor="process") is False
@@ -0,0 +1,115 @@
+import pytest
+from scripttease.library.commands import Command
+from scripttease.parsers.filters import *
+from scripttease.parsers.utils import CommandIndex
+
+
+COMMANDS = [
+    Command("apt-get install apache2 -y", comment="install apache", environments=["base"], name="install",
+            tags=["web"]),
+    Command("apt-get install apache-top -y", comment="install apache top", environments=["live"], name="install",
+            tags=["web"]),
+    Command("pip install django-debug-toolbar", comment="install debug toolbar", environments=["development"],
+            name="pip", tags=["django"]),
+    Command("pip install django", comment="install django", environments=["base"], name="pip", tags=["django"]),
+    Command("mkdir -p /var/www", comment="create the web directory", name="mkdir", tags=["web"]),
+]
+
+
+def test_compile_filter():
+    f = compile_filter("tags:web")
+    assert f.filter(COMMANDS) == [COMMANDS[0], COMMANDS[1], COMMANDS[4]]
+
+    # Commands without environments apply to all environments.
+    f = compile_filter("env:live")
+    assert f.filter(COMMANDS) == [COMMANDS[1], COMMANDS[4]]
+
+    f = compile_filter("env:base and (tags:web or tags:django)")
+    assert f.filter(COMMANDS) == [COMMANDS[0], COMMANDS[3], COMMANDS[4]]
+
+    # Adjacent terms must all match.
+    assert compile_filter("tags:web name:install").filter(COMMANDS) == [COMMANDS[0], COMMANDS[1]]
+
+    f = compile_filter('tags:web and not comment:"install *"')
+    assert f.filter(COMMANDS) == [COMMANDS[4]]
+
+    f = compile_filter("name:pi* OR section:/^create .* directory$/")
+    assert f.filter(COMMANDS) == [COMMANDS[2], COMMANDS[3], COMMANDS[4]]
+
+    f = compile_filter("NOT NOT tags:django")
+    assert f.filter(COMMANDS) == [COMMANDS[2], COMMANDS[3]]
+
+    invalid = [
+        "",
+        "web",
+        "nonexistent:web",
+        "(tags:web",
+        "tags:web)",
+        "tags:web and",
+        "tags:web or or tags:django",
+        "section:/(/",
+    ]
+    for expression in invalid:
+        with pytest.raises(ValueError):
+            compile_filter(expression)
+
+
+def test_is_expression():
+    assert is_expression("tags:web") is False
+    assert is_expression("tags:web or tags:django") is True
+    assert is_expression("section:/^install/") is True
+    assert is_expression('comment:"install apache"') is True
+
+
+class TestFilter(object):
+
+    def test_call(self):
+        f = compile_filter("tags:web")
+        assert f(COMMANDS[0]) is True
+        assert f(COMMANDS[2]) is False
+
+    def test_get_positions(self):
+        index = CommandIndex(COMMANDS)
+
+        expressions = [
+            "tags:web",
+            "env:live",
+            "env:base and (tags:web or tags:django)",
+            'tags:web and not comment:"install *"',
+            "name:pi* or section:/^create .* directory$/",
+            "tags:w* and not env:dev*",
+        ]
+        for expression in expressions:
+            f = compile_filter(expression)
+            assert index.select(f) == f.filter(COMMANDS)
+
+    def test_may_match(self):
+        expressions = [
+            "tags:web",
+            "env:live and not tags:web",
+            'tags:web and not comment:"install *"',
+            "name:pi* or tags:django",
+            'not (tags:web or comment:"install *")',
+        ]
+        for expression in expressions:
+            f = compile_filter(expression)
+            for command in COMMANDS:
+                # A command that matches may always match.
+                if f.match(command):
+                    assert f.may_match(command) is True
+
+        f = compile_filter('tags:web and not comment:"install *"')
+        assert f.may_match(COMMANDS[0]) is True
+        assert f.may_match(COMMANDS[2]) is False
+
+        f = compile_filter("name:pi* or tags:django")
+        assert f.may_match(COMMANDS[0]) is True
+
+        f = compile_filter('not (tags:web or comment:"install *")')
+        assert f.may_match(COMMANDS[0]) is False
+        assert f.may_match(COMMANDS[2]) is True
+
+    def test_repr(self):
+        f = compile_filter("tags:web")
+        assert repr(f) == "<Filter tags:web>"
+        assert str(f) == "tags:web"
@@ -1,4 +1,8 @@
-import pytest
+import os
+import subprocess
+import sys
+import tracemalloc
+from scripttease.parsers.filters import compile_filter
 from scripttease.parsers.ini import Config
 
 
@@ -16,6 +20,13 @@ class TestConfig(object):
 
         assert len(c.get_functions()) > 0
 
+        c = Config("tests/examples/function_examples.ini")
+        assert c.load() is True
+
+        functions = c.get_functions()
+        assert functions[0].name == "apache_setup"
+        assert len(functions[0].commands) == 5
+
     def test_load(self):
         c = Config("nonexistent.ini")
         assert c.load() is False
@@ -35,6 +46,11 @@ class TestConfig(object):
         c = Config("tests/examples/bad_command.ini")
         assert c.load() is False
 
+        c = Config("tests/examples/items_from_example.ini")
+        assert c.load() is True
+        assert "pip3 install django" in c.get_commands()[0].get_statement()
+        assert len(c.get_commands()[1].get_commands()) == 4
+
         context = {
             'domain_tld': "example_com",
         }
@@ -46,3 +62,185 @@ class TestConfig(object):
         }
         c = Config("tests/examples/bad_template_example.ini", context=context)
         assert c.load() is False
+
+        c = Config("tests/examples/duplicate_example.ini")
+        assert c.load() is False
+
+    def test_load_defaults(self):
+        c = Config("tests/examples/sections_example.ini")
+        assert c.load() is True
+
+        commands = c.get_commands()
+        assert len(commands) == 2
+        assert commands[0].get_statement() == "# create the site directory\nmkdir -m 755 -p /var/www/example_com"
+        assert commands[1].tags == ["python"]
+
+    def test_strict(self, tmp_path):
+        path = str(tmp_path / "commands.ini")
+        with open(path, "w") as f:
+            f.write("[create a directory]\nmkdir: /tmp/one\n\n[create a directory]\nmkdir: /tmp/two\n")
+
+        c = Config(path)
+        assert c.load() is False
+
+        c = Config(path, strict=False)
+        assert c.load() is True
+        assert len(c.get_commands()) == 2
+
+    def test_encoding(self, tmp_path):
+        path = str(tmp_path / "commands.ini")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[créer le répertoire]\nmkdir: /var/www/été\n")
+
+        # Files are read as UTF-8 regardless of the locale.
+        env = os.environ.copy()
+        env['LC_ALL'] = "C"
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        code = ("import sys; from scripttease.parsers.ini import Config; "
+                "sys.exit(0 if Config(sys.argv[1]).load() else 1)")
+        result = subprocess.run([sys.executable, "-X", "utf8=0", "-c", code, path], env=env)
+        assert result.returncode == 0
+
+    def test_filters(self):
+        c = Config("tests/examples/python_examples.ini", filters={'tags': ["python-support"]})
+        assert c.load() is True
+        assert len(c.get_commands()) == 2
+        assert c.skipped == 1
+
+        # Options apply to every command.
+        c = Config("tests/examples/python_examples.ini", filters={'tags': ["web"]}, options={'tags': ["web"]})
+        assert c.load() is True
+        assert c.skipped == 3
+
+        c = Config("tests/examples/python_examples.ini", filters={'environments': ["live"]},
+                   options={'environments': ["live"]})
+        assert c.load() is True
+        assert c.skipped == 0
+
+        c = Config("tests/examples/python_examples.ini", filters={'environments': ["live"]},
+                   options={'environments': "development"})
+        assert c.load() is True
+        assert c.skipped == 3
+
+        c = Config("tests/examples/python_examples.ini",
+                   filters=compile_filter("tags:depends or section:/virtual environment$/"))
+        assert c.load() is True
+        assert [command.comment for command in c.get_commands()] == ["create a virtual environment", "install pillow"]
+        assert c.skipped == 1
+
+        # Functions and the commands that belong to them are not filtered.
+        c = Config("tests/examples/function_examples.ini", filters={'tags': ["nonexistent"]})
+        assert c.load() is True
+        assert c.skipped == 1
+        assert len(c.get_commands()) == 0
+        assert len(c.get_functions()[0].commands) == 5
+
+    def test_filters_overlay(self, tmp_path):
+        # The comment of the perms command is set by the overlay rather than the section.
+        path = str(tmp_path / "commands.ini")
+        with open(path, "w") as f:
+            f.write("[fix www]\nperms = /var/www\nmode = 755\ntags = web\n\n")
+            f.write("[create www]\nmkdir = /var/www\nenvironments = live\ntags = web\n\n")
+            f.write("[create logs]\nmkdir = /var/log/example\nenvironments = development\n")
+
+        expressions = (
+            'section:"set permissions*"',
+            'section:"fix www"',
+            'section:"create *" and not env:development',
+            "tags:web and not name:perms",
+            "not tags:web or comment:/permissions/",
+            "env:live and tags:web",
+        )
+
+        c = Config(path)
+        assert c.load() is True
+        commands = c.get_commands()
+
+        # Commands selected before and after they are created are the same.
+        for expression in expressions:
+            _filter = compile_filter(expression)
+
+            c = Config(path, filters=_filter)
+            assert c.load() is True
+
+            expected = [command.get_statement() for command in _filter.filter(commands)]
+            assert [command.get_statement() for command in c.get_commands()] == expected
+            assert c.skipped == len(commands) - len(expected)
+
+        c = Config(path, filters=compile_filter('section:"set permissions*"'))
+        assert c.load() is True
+        assert [command.name for command in c.get_commands()] == ["perms"]
+
+    def test_template_context_memory(self, tmp_path):
+        # template_example.ini is scaled up to many templates with a large context.
+        context = {'domain_tld': "example_com"}
+        for i in range(500):
+            context['variable_%s' % i] = "value %s" % i
+
+        path = tmp_path / "template_example.ini"
+        with open("tests/examples/template_example.ini", "r") as f:
+            content = f.read()
+
+        with open(str(path), "w") as f:
+            f.write(content)
+            for i in range(300):
+                f.write("\n[write template %s]\n" % i)
+                f.write("template: good.j2.txt /var/www/domains/{{ domain_tld }}/%s.txt\n" % i)
+
+        tracemalloc.start()
+        c = Config(str(path), context=context, locations=[os.path.abspath("tests/examples/templates")])
+        assert c.load() is True
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        templates = c.get_templates()
+        assert len(templates) == 300
+
+        # Templates share the context instead of holding a copy of it.
+        assert templates[0].context.maps[-1] is context
+        assert templates[0].context['variable_499'] == "value 499"
+        assert used / len(templates) < sys.getsizeof(context)
+
+    def test_iter_sections(self):
+        c = Config("tests/examples/sections_example.ini")
+        sections = list(c._iter_sections())
+        assert len(sections) == 2
+
+        # Default values follow the keys of the section.
+        name, items = sections[0]
+        assert name == "create the site directory"
+        assert items == [("mkdir", "/var/www/example_com"), ("mode", "755"), ("base", "/var/www")]
+
+        # An indented header is part of the value.
+        name, items = sections[1]
+        assert ("pip", '"django\n[not a header]"') in items
+
+        c = Config("tests/examples/template_example.ini", context={'domain_tld': "example_com"})
+        assert list(c._iter_sections()) == [("create the site directory", [("mkdir", "/var/www/domains/example_com")])]
+
+    def test_iter_sections_groups(self, monkeypatch, tmp_path):
+        path = str(tmp_path / "commands.ini")
+        with open(path, "w") as f:
+            f.write("[DEFAULT]\nbase = /opt\n\n")
+            for i in range(250):
+                if i == 120:
+                    f.write("[DEFAULT]\nbase = /var/www\n\n")
+
+                # Names are repeated, which is allowed when not strict.
+                f.write("[create directory %s]\nmkdir = %%(base)s/%s\n\n" % (i % 200, i))
+
+            f.write("[DEFAULT]\nbase = /srv\n\n[create directory last]\nmkdir = %(base)s/last\n")
+
+        # Sections are the same no matter how many are read at a time.
+        monkeypatch.setattr("scripttease.parsers.ini.SECTIONS_PER_READ", 1)
+        expected = list(Config(path, strict=False)._iter_sections())
+        assert len(expected) == 251
+        assert expected[119][1] == [("mkdir", "/opt/119"), ("base", "/opt")]
+        assert expected[120][1] == [("mkdir", "/var/www/120"), ("base", "/var/www")]
+        assert expected[200][0] == "create directory 0"
+        assert expected[-1][1] == [("mkdir", "/srv/last"), ("base", "/srv")]
+
+        for count in (7, 100, 1000):
+            monkeypatch.setattr("scripttease.parsers.ini.SECTIONS_PER_READ", count)
+            assert list(Config(path, strict=False)._iter_sections()) == expected
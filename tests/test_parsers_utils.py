@@ -24,6 +24,24 @@ def test_filter_commands():
     assert len(f4) == 1
 
 
+def test_iter_statements():
+    statements = list(iter_statements("tests/examples/python_examples.ini", filters={'tags': ["python-support"]}))
+    assert len(statements) == 2
+
+    commands = load_commands("tests/examples/python_examples.ini", filters={'tags': ["python-support"]})
+    assert statements == [c.get_statement(cd=True) for c in commands]
+
+    # Commands that belong to functions are not included.
+    statements = list(iter_statements("tests/examples/function_examples.ini"))
+    assert statements == ["# call apache setup\napache_setup"]
+
+    with pytest.raises(RuntimeError):
+        list(iter_statements("nonexistent.xml"))
+
+    with pytest.raises(RuntimeError):
+        list(iter_statements("tests/examples/bad_examples.ini"))
+
+
 def test_load_commands():
     commands = load_commands("nonexistent.xml")
     assert commands is None
@@ -34,6 +52,9 @@ def test_load_commands():
     commands = load_commands("tests/examples/bad_examples.ini")
     assert commands is None
 
+    commands = load_commands("tests/examples/kitchen_sink.yml", filters={'tags': ["web"]})
+    assert len(commands) == 1
+
     commands = load_commands(
         "tests/examples/python_examples.ini",
         filters={
@@ -54,6 +75,66 @@ def test_load_variables():
     variables = load_variables(os.path.join("tests", "examples", "variables.ini"), environment="testing")
     assert len(variables) == 4
 
+    # The order of the file is kept.
+    assert [v.name for v in variables] == ["domain_name", "domain_tld", "debug_enabled", "postgres_version"]
+
+    variables = load_variables(os.path.join("tests", "examples", "variables.ini"), environment="live")
+    assert variables[-1].name == "mailgun_domain"
+
+    # Changes made to the variables do not affect those loaded later.
+    variables[0].value = "changed"
+    variables[0].tags.append("changed")
+    variables = load_variables(os.path.join("tests", "examples", "variables.ini"), environment="live")
+    assert variables[0].value != "changed"
+    assert "changed" not in variables[0].tags
+
+
+class TestCommandIndex(object):
+
+    def test_filter(self):
+        commands = [
+            Command("apt-get install apache2 -y", environments=["base"], tags=["web"]),
+            Command("apt-get install apache-top -y", environments=["live"], tags=["web"]),
+            Command("pip install django-debug-toolbar", environments=["development"], tags=["django"]),
+            Command("pip install django", environments=["base"], tags=["django"]),
+            Command("pip install gunicorn", tags=["django", "web"]),
+        ]
+        index = CommandIndex(commands)
+
+        # Results are the same as filter_commands().
+        criteria = [
+            dict(),
+            {'environments': ["base", "live"]},
+            {'tags': ["django"]},
+            {'environments': ["base", "development"]},
+            {'environments': ["base"], 'tags': ["web"]},
+            {'environments': ["nonexistent"]},
+            {'tags': ["nonexistent"]},
+        ]
+        for kwargs in criteria:
+            assert index.filter(**kwargs) == filter_commands(commands, **kwargs)
+
+        assert index.filter(environments=["live"]) == [commands[1], commands[4]]
+
+        # An index may be given to filter_commands().
+        assert filter_commands(index, tags=["web"]) == index.filter(tags=["web"])
+
+    def test_get_positions(self):
+        commands = [
+            Command("apt-get install apache2 -y", environments=["base"], tags=["web"]),
+            ItemizedCommand(Command, ["one", "two"], "touch $item", tags=["web"]),
+        ]
+        index = CommandIndex(commands)
+        assert index.get_positions() is None
+        assert index.get_positions(tags=["web"]) == {0, 1}
+        assert index.get_positions(environments=["live"]) == {1}
+
+    def test_len(self):
+        assert len(CommandIndex([Command("ls")])) == 1
+
+    def test_repr(self):
+        assert repr(CommandIndex([Command("ls")])) == "<CommandIndex (1)>"
+
 
 class TestContext(object):
 
@@ -70,6 +151,16 @@ class TestContext(object):
         with pytest.raises(RuntimeError):
             c.add("testing", True)
 
+    def test_child(self):
+        c = Context(testing=True, also_testing=False)
+        child = c.child(testing=False)
+        assert child.testing is False
+        assert child.also_testing is False
+        assert c.testing is True
+
+        child.add("still_testing", True)
+        assert c.has("still_testing") is False
+
     def test_get(self):
         c = Context(testing=True)
         assert c.get("testing") is True
@@ -111,10 +202,29 @@ class TestContext(object):
         c1.merge(c2)
         assert len(c1.variables) == 3
 
+        # Existing variables are not replaced.
+        c3 = Context(testing=False)
+        c1.merge(c3)
+        assert c1.testing is True
+
+        # Merged variables are not copied.
+        c2.add("yet_another", True)
+        assert c1.yet_another is True
+
     def test_repr(self):
         c = Context(testing=True, also_testing=False, still_testing=True)
         assert repr(c) == "<Context (3)>"
 
+    def test_view(self):
+        c = Context(testing=True, also_testing=123)
+        view = c.view()
+        assert view['also_testing'] == 123
+        assert len(view) == 2
+        assert repr(view) == "<ContextView (2)>"
+
+        c.add("still_testing", True)
+        assert view['still_testing'] is True
+
 
 class TestVariable(object):
 
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from scripttease.parsers.ini import Config
+from scripttease.parsers.yaml import YAML
+
+
+class TestYAML(object):
+
+    def test_get_commands(self):
+        c = YAML("tests/examples/kitchen_sink.yml")
+        assert c.load() is True
+
+        commands = c.get_commands()
+        assert len(commands) == 6
+
+        # Documents are loaded in order.
+        assert commands[4].comment == "run the tests"
+        assert commands[4].environments == ["development", "staging"]
+
+        # Lists may be given as YAML sequences or comma separated strings.
+        assert commands[0].tags == ["web"]
+        assert len(commands[3].get_commands()) == 3
+
+        # Arguments may be given as a sequence.
+        assert "cp /path/to/source.txt /path/to/target.txt" in commands[5].get_statement()
+
+    def test_encoding(self, tmp_path):
+        path = str(tmp_path / "commands.yml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("créer le répertoire:\n  mkdir: /var/www/été\n")
+
+        # Files are read as UTF-8 regardless of the locale.
+        env = os.environ.copy()
+        env['LC_ALL'] = "C"
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        code = ("import sys; from scripttease.parsers.yaml import YAML; "
+                "sys.exit(0 if YAML(sys.argv[1]).load() else 1)")
+        result = subprocess.run([sys.executable, "-X", "utf8=0", "-c", code, path], env=env)
+        assert result.returncode == 0
+
+    def test_iter_sections(self):
+        c = YAML("tests/examples/kitchen_sink.yml")
+        sections = list(c._iter_sections())
+        assert len(sections) == 6
+
+        name, items = sections[1]
+        assert name == "create the web site directory"
+        # Values are cast in the same way as INI values, when the command is created.
+        assert items == [("mkdir", "/var/www/domains/example_com/www"), ("recursive", "yes")]
+
+    def test_ini_parity(self, tmp_path):
+        ini_path = str(tmp_path / "commands.ini")
+        with open(ini_path, "w") as f:
+            f.write("[set permissions]\nperms: /var/www\nmode: 0755\nrecursive: yes\ntags: web, django\n\n")
+            f.write("[create directories]\nmkdir: /var/www/$item\nitems: www, logs\nmode: 0750\n\n")
+            f.write("[copy a file]\ncopy: /path/to/source.txt /path/to/target.txt\noverwrite: no\n")
+
+        yaml_path = str(tmp_path / "commands.yml")
+        with open(yaml_path, "w") as f:
+            f.write("set permissions:\n  perms: /var/www\n  mode: 0755\n  recursive: yes\n  tags: [web, django]\n")
+            f.write("create directories:\n  mkdir: /var/www/$item\n  items: [www, logs]\n  mode: 0750\n")
+            f.write("copy a file:\n  copy: [/path/to/source.txt, /path/to/target.txt]\n  overwrite: no\n")
+
+        ini = Config(ini_path)
+        assert ini.load() is True
+
+        c = YAML(yaml_path)
+        assert c.load() is True
+
+        statements = [command.get_statement(cd=True) for command in c.get_commands()]
+        assert statements == [command.get_statement(cd=True) for command in ini.get_commands()]
+        assert "chmod -R 755 /var/www" in statements[0]
+        assert [command.tags for command in c.get_commands()] == [command.tags for command in ini.get_commands()]
+
+    def test_load(self):
+        c = YAML("nonexistent.yml")
+        assert c.load() is False
+
+        c = YAML("tests/examples/kitchen_sink.yml", overlay="nonexistent")
+        assert c.load() is False
+
+        c = YAML("tests/examples/bad_examples.yml")
+        assert c.load() is False
+
+        c = YAML("tests/examples/kitchen_sink.yml", context={'testing': "yes"})
+        assert c.load() is True